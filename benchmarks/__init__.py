@@ -0,0 +1,10 @@
+"""Scaling benchmarks for the routing engine and the view payload.
+
+Run from the repository root::
+
+    python -m benchmarks                              # 1k, 10k and 100k edges
+    python -m benchmarks --scales 1k,1m --save-baseline benchmarks/baseline.json
+    python -m benchmarks --compare benchmarks/baseline.json
+
+See :mod:`benchmarks.run` for the stages that are measured.
+"""
@@ -0,0 +1,67 @@
+"""Seeded synthetic graphs, as lists of ``(source, target, weight)`` edges.
+
+Every generator orients edges from lower to higher node number, so all of
+them are DAGs and the critical-path stage can run on each. Node names are
+strings, like the ones the importers produce.
+"""
+
+import math
+import random
+
+
+def _weight(rng):
+    return round(rng.uniform(1, 10), 1)
+
+
+def random_dag(edges, seed=0):
+    """Uniformly random DAG with about four edges per node."""
+    rng = random.Random(seed)
+    n = max(2, edges // 4)
+    seen = set()
+    result = []
+    while len(result) < edges:
+        u, v = sorted(rng.sample(range(n), 2))
+        if (u, v) not in seen:
+            seen.add((u, v))
+            result.append((str(u), str(v), _weight(rng)))
+    return result
+
+
+def grid(edges, seed=0):
+    """Square lattice with edges pointing right and down."""
+    rng = random.Random(seed)
+    side = max(2, math.isqrt(edges // 2) + 1)
+    result = []
+    for i in range(side):
+        for j in range(side):
+            node = i * side + j
+            if j + 1 < side:
+                result.append((str(node), str(node + 1), _weight(rng)))
+            if i + 1 < side:
+                result.append((str(node), str(node + side), _weight(rng)))
+    return result[:edges]
+
+
+def scale_free(edges, seed=0, attach=3):
+    """Preferential attachment (Barabási–Albert): a few hubs, many leaves."""
+    rng = random.Random(seed)
+    # Every endpoint ever used, so sampling from it favours high-degree nodes
+    endpoints = list(range(attach))
+    result = []
+    node = attach
+    while len(result) < edges:
+        targets = set()
+        while len(targets) < attach:
+            targets.add(rng.choice(endpoints))
+        for target in targets:
+            result.append((str(target), str(node), _weight(rng)))
+            endpoints.extend((target, node))
+        node += 1
+    return result[:edges]
+
+
+GENERATORS = {
+    "random_dag": random_dag,
+    "grid": grid,
+    "scale_free": scale_free,
+}
@@ -0,0 +1,172 @@
+"""Benchmark driver: time, peak memory and payload size per stage and scale.
+
+For every generator and scale the graph goes through the same steps the app
+takes on a rerun:
+
+``build``
+    Loading the edges into the graph store.
+``shortest_path``
+    One Dijkstra query to the farthest reachable node (what the app runs
+    for "Find Shortest Path").
+``full_tree``
+    Settling every reachable node, i.e. the worst-case ``visited_nodes``.
+``critical_path``
+    The forward/backward CPM passes over the whole DAG.
+``traffic``
+    A fixed-length traffic simulation of one flow along that path
+    (``TRAFFIC_PACKETS`` packets), i.e. event throughput.
+``payload_full`` / ``payload_overview``
+    Building and JSON-serializing the full and the clustered view snapshot;
+    these also report the payload size in bytes.
+
+Wall time is the best of ``--repeat`` runs; peak memory comes from one extra
+run under :mod:`tracemalloc`. ``--save-baseline`` stores the results and
+``--compare`` flags anything that got slower, bigger or heavier than the
+stored run by more than ``--tolerance``.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generators import GENERATORS
+from netsim.compact_graph import CompactGraph
+from netsim.critical_path import critical_path
+from netsim.render import detail_payload, overview_payload, path_neighborhood
+from netsim.shortest_path import dijkstra
+from netsim.traffic import Flow, TrafficSimulation
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Timings below this are too noisy to call a regression.
+MIN_SECONDS = 0.02
+
+# Packets injected by the traffic stage (one per time unit, for this many units)
+TRAFFIC_PACKETS = 20_000
+
+
+def measure(fn, repeat):
+    """Return ``(best seconds, peak traced bytes, fn's result)``."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def build_graph(edges, store):
+    if store == "networkx":
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_weighted_edges_from(edges)
+        return G
+    return CompactGraph.from_edges(edges)
+
+
+def run_case(edges, store, repeat):
+    """Run every stage on one graph; returns ``{stage: measurement}``."""
+    results = {}
+
+    def record(stage, fn, payload=False):
+        seconds, peak, value = measure(fn, repeat)
+        results[stage] = {"seconds": seconds, "peak_bytes": peak}
+        if payload:
+            results[stage]["payload_bytes"] = value
+        return value
+
+    G = record("build", lambda: build_graph(edges, store))
+    # Node "0" comes first in every generator's order, so it reaches the most
+    source = "0"
+    tree = record("full_tree", lambda: dijkstra(G, source))
+    target = tree.order[-1]
+    path = record("shortest_path", lambda: dijkstra(G, source, target).query(G, target).path)
+    record("critical_path", lambda: critical_path(G))
+    record("traffic", lambda: TrafficSimulation(
+        G, [Flow(source, target, 1.0, poisson=False)], capacity=2.0, seed=0
+    ).step(TRAFFIC_PACKETS))
+
+    rng = random.Random(0)
+    positions = {node: {"x": rng.uniform(-300, 300), "y": rng.uniform(-200, 200)} for node in G.nodes()}
+    focus = path_neighborhood(G, path)
+    record("payload_full", lambda: len(json.dumps(detail_payload(G, positions))), payload=True)
+    record("payload_overview", lambda: len(json.dumps(overview_payload(G, positions, focus))), payload=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return ``{key: [reasons]}`` for every measurement worse than ``baseline``."""
+    regressions = {}
+    for key, current in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        reasons = []
+        if current["seconds"] > before["seconds"] * (1 + tolerance) and current["seconds"] > MIN_SECONDS:
+            reasons.append(f"time {before['seconds']:.4f}s → {current['seconds']:.4f}s")
+        if current["peak_bytes"] > before["peak_bytes"] * (1 + tolerance):
+            reasons.append(f"memory {before['peak_bytes'] / 1e6:.1f} MB → {current['peak_bytes'] / 1e6:.1f} MB")
+        if current.get("payload_bytes", 0) > before.get("payload_bytes", 0) * (1 + tolerance):
+            reasons.append(f"payload {before['payload_bytes']:,} B → {current['payload_bytes']:,} B")
+        if reasons:
+            regressions[key] = reasons
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", default="1k,10k,100k", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--graphs", default=",".join(GENERATORS), help=f"comma-separated, from {', '.join(GENERATORS)}")
+    parser.add_argument("--store", choices=["compact", "networkx"], default="compact", help="graph store to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is kept)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a baseline FILE")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'benchmark':<40} {'seconds':>10} {'peak MB':>10} {'payload KB':>12}")
+    for name in args.graphs.split(","):
+        for scale in args.scales.split(","):
+            edges = GENERATORS[name](SCALES[scale])
+            for stage, measured in run_case(edges, args.store, args.repeat).items():
+                key = f"{name}/{scale}/{stage}"
+                results[key] = measured
+                payload = measured.get("payload_bytes")
+                print(
+                    f"{key:<40} {measured['seconds']:>10.4f} {measured['peak_bytes'] / 1e6:>10.1f} "
+                    f"{'' if payload is None else f'{payload / 1e3:,.1f}':>12}",
+                    flush=True,
+                )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "store": args.store,
+                "results": results,
+            }, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for key, reasons in regressions.items():
+            print(f"REGRESSION {key}: {'; '.join(reasons)}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
@@ -0,0 +1,55 @@
+"""Graph engine behind the Network Pathfinding Simulator.
+
+Everything in this package works on plain graph objects and never imports
+Streamlit, so it can be reused outside the app; ``python -m netsim`` runs
+queries from the shell. Names are imported on first use, so importing the
+package itself is cheap.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "CompactGraph": "netsim.compact_graph",
+    "ComponentIndex": "netsim.components",
+    "ContractionHierarchy": "netsim.contraction",
+    "CriticalPathResult": "netsim.critical_path",
+    "CycleError": "netsim.exceptions",
+    "DistanceIndex": "netsim.distance_index",
+    "FailedView": "netsim.failures",
+    "Flow": "netsim.traffic",
+    "FlowNetwork": "netsim.maxflow",
+    "GraphStore": "netsim.store",
+    "MaxFlowResult": "netsim.maxflow",
+    "NetsimError": "netsim.exceptions",
+    "NoPathError": "netsim.exceptions",
+    "ResultCache": "netsim.result_cache",
+    "RouteResult": "netsim.batch",
+    "SearchResult": "netsim.shortest_path",
+    "ShortestPathTree": "netsim.shortest_path",
+    "TrafficSimulation": "netsim.traffic",
+    "astar": "netsim.shortest_path",
+    "batch_routes": "netsim.batch",
+    "bidirectional_dijkstra": "netsim.shortest_path",
+    "critical_path": "netsim.critical_path",
+    "dijkstra": "netsim.shortest_path",
+    "disjoint_paths": "netsim.alternatives",
+    "graph_fingerprint": "netsim.result_cache",
+    "k_shortest_paths": "netsim.alternatives",
+    "link_failure_sweep": "netsim.failures",
+    "read_graph": "netsim.graph_io",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'netsim' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,33 @@
+"""Uniform weighted-adjacency access for NetworkX and compact graphs.
+
+The engine's algorithms only ever ask three questions of a graph: which
+nodes exist, who are a node's weighted successors, and who are its weighted
+predecessors. These helpers answer them for both ``nx.DiGraph`` and
+:class:`~netsim.compact_graph.CompactGraph`, so neither has to be converted.
+"""
+
+
+def successors(G, weight="weight"):
+    """Return a function mapping a node to its ``(successor, weight)`` pairs."""
+    native = getattr(G, "weighted_successors", None)
+    if native is not None:
+        return native
+    succ = G.succ
+    return lambda u: [(v, d.get(weight, 1)) for v, d in succ[u].items()]
+
+
+def predecessors(G, weight="weight"):
+    """Return a function mapping a node to its ``(predecessor, weight)`` pairs."""
+    native = getattr(G, "weighted_predecessors", None)
+    if native is not None:
+        return native
+    pred = G.pred
+    return lambda v: [(u, d.get(weight, 1)) for u, d in pred[v].items()]
+
+
+def edge_weight(G, u, v, weight="weight"):
+    """Return the weight of edge ``u → v`` (``None`` if there is no such edge)."""
+    data = G.get_edge_data(u, v)
+    if data is None:
+        return None
+    return data.get(weight, 1)
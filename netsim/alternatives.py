@@ -0,0 +1,226 @@
+"""Alternative routes between two nodes, for failover analysis.
+
+:func:`k_shortest_paths` is Yen's algorithm for the ``k`` cheapest loopless
+paths. One reverse Dijkstra tree from the target is grown up front and
+reused by every spur search: its distances are an admissible A* estimate
+for the search with edges and nodes removed (removing things only makes
+routes longer), and whenever a spur node's tree route avoids everything
+removed it *is* the spur path, so no search runs at all.
+
+:func:`disjoint_paths` finds up to ``k`` edge- or node-disjoint routes of
+least total cost by successive shortest paths on the residual graph
+(Suurballe's method generalized to ``k``), with Johnson potentials so every
+round is a plain Dijkstra.
+"""
+
+import math
+from heapq import heappop, heappush
+from itertools import count
+
+from netsim.adjacency import edge_weight, successors
+from netsim.exceptions import NoPathError
+from netsim.shortest_path import SearchResult, distances_to
+
+
+def _spur_search(succ, spur, target, remaining, banned_nodes, banned_first):
+    """Cheapest ``spur → target`` path avoiding ``banned_nodes`` and the edges ``spur → banned_first``.
+
+    ``remaining`` (distances to the target in the full graph) guides the
+    A* search and prunes nodes that cannot reach the target at all. Returns
+    ``(path, cost, settled)``, with ``path`` ``None`` if there is none.
+    """
+    tie = count()
+    cost = {spur: 0}
+    pred = {}
+    closed = set()
+    settled = []
+    heap = [(remaining[spur], next(tie), spur, 0)]
+    while heap:
+        _, _, u, g = heappop(heap)
+        if u in closed or g > cost[u]:
+            continue
+        closed.add(u)
+        settled.append(u)
+        if u == target:
+            path = [target]
+            while path[-1] != spur:
+                path.append(pred[path[-1]])
+            path.reverse()
+            return path, g, settled
+        for v, w in succ(u):
+            if v in banned_nodes or v not in remaining or (u == spur and v in banned_first):
+                continue
+            ng = g + w
+            if v not in cost or ng < cost[v]:
+                cost[v] = ng
+                pred[v] = u
+                heappush(heap, (ng + remaining[v], next(tie), v, ng))
+    return None, math.inf, settled
+
+
+def k_shortest_paths(G, source, target, k, weight="weight"):
+    """Return up to ``k`` loopless ``source → target`` paths, cheapest first.
+
+    Each result is a :class:`~netsim.shortest_path.SearchResult`; the first
+    one's ``explored`` is the reverse tree's settle order up to ``source``,
+    the others' list the nodes their spur search settled (empty when the
+    tree answered it directly). Raises :class:`NoPathError` if there is no
+    path at all.
+    """
+    if source not in G or target not in G:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    remaining, hop, order = distances_to(G, target, weight)
+    if source not in remaining:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    succ = successors(G, weight)
+
+    def tree_path(node):
+        path = [node]
+        while path[-1] != target:
+            path.append(hop[path[-1]])
+        return path
+
+    first = tree_path(source)
+    found = [SearchResult(first, remaining[source], order[:order.index(source) + 1])]
+    # Cumulative cost along each accepted path, for the cost of its roots
+    prefix = [[remaining[source] - remaining[node] for node in first]]
+    candidates = []
+    seen = {tuple(first)}
+    tie = count()
+
+    while len(found) < k:
+        previous = found[-1].path
+        previous_prefix = prefix[-1]
+        for i, spur in enumerate(previous[:-1]):
+            root = previous[:i + 1]
+            banned_first = {path.path[i + 1] for path in found if path.path[:i + 1] == root}
+            banned_nodes = set(root[:-1])
+            direct = tree_path(spur) if spur in remaining else None
+            if direct is not None and direct[1] not in banned_first and banned_nodes.isdisjoint(direct):
+                spur_path, spur_cost, settled = direct, remaining[spur], []
+            else:
+                spur_path, spur_cost, settled = _spur_search(succ, spur, target, remaining, banned_nodes, banned_first)
+            if spur_path is None:
+                continue
+            path = root[:-1] + spur_path
+            if tuple(path) in seen:
+                continue
+            seen.add(tuple(path))
+            heappush(candidates, (previous_prefix[i] + spur_cost, next(tie), path, settled))
+        if not candidates:
+            break
+        cost, _, path, settled = heappop(candidates)
+        found.append(SearchResult(path, cost, settled))
+        running = [0]
+        for u, v in zip(path, path[1:]):
+            running.append(running[-1] + edge_weight(G, u, v, weight))
+        prefix.append(running)
+    return found
+
+
+def disjoint_paths(G, source, target, k=2, node_disjoint=False, weight="weight"):
+    """Return up to ``k`` pairwise disjoint ``source → target`` paths of least total cost.
+
+    Paths share no edge, or with ``node_disjoint`` no node other than the
+    endpoints. Fewer than ``k`` are returned when the graph has fewer
+    disjoint routes; raises :class:`NoPathError` if it has none. Results are
+    :class:`~netsim.shortest_path.SearchResult` objects, cheapest first.
+    """
+    if source not in G or target not in G or source == target:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    names = list(G.nodes())
+    index = {node: i for i, node in enumerate(names)}
+    succ = successors(G, weight)
+    n = len(names)
+
+    # Residual graph as parallel lists; edge e's reverse is e ^ 1
+    head, cap, cost = [], [], []
+    adj = [[] for _ in range(2 * n if node_disjoint else n)]
+
+    def add(u, v, c, w):
+        adj[u].append(len(head))
+        head.append(v)
+        cap.append(c)
+        cost.append(w)
+        adj[v].append(len(head))
+        head.append(u)
+        cap.append(0)
+        cost.append(-w)
+
+    # Edges leave node i from i + offset; with node_disjoint, node i is split
+    # into i (in) → n + i (out), an edge only one path may use
+    offset = n if node_disjoint else 0
+    if node_disjoint:
+        for i in range(n):
+            add(i, n + i, k if i in (index[source], index[target]) else 1, 0)
+    for u in names:
+        for v, w in succ(u):
+            if v != u:
+                add(index[u] + offset, index[v], 1, w)
+
+    s, t = index[source] + offset, index[target]
+    potential = [0.0] * len(adj)
+    flow = 0
+    while flow < k:
+        dist = [math.inf] * len(adj)
+        via = [-1] * len(adj)
+        dist[s] = 0
+        heap = [(0, s)]
+        while heap:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            for e in adj[u]:
+                if cap[e] <= 0:
+                    continue
+                v = head[e]
+                # Reduced costs are non-negative thanks to the potentials
+                nd = d + cost[e] + potential[u] - potential[head[e]]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    via[v] = e
+                    heappush(heap, (nd, v))
+        if dist[t] == math.inf:
+            break
+        for v in range(len(adj)):
+            if dist[v] < math.inf:
+                potential[v] += dist[v]
+        v = t
+        while v != s:
+            e = via[v]
+            cap[e] -= 1
+            cap[e ^ 1] += 1
+            v = head[e ^ 1]
+        flow += 1
+    if flow == 0:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+
+    # Saturated graph edges (not the node-splitting ones) carry the flow
+    used = {}
+    for e in range(2 * n if node_disjoint else 0, len(head), 2):
+        if cap[e] == 0:
+            used.setdefault(head[e ^ 1], []).append(e)
+    results = []
+    for _ in range(flow):
+        path = [source]
+        u = s
+        while True:
+            v = head[used[u].pop()]
+            path.append(names[v])
+            if v == t:
+                break
+            u = v + offset
+        # Zero-cost cycles can sneak into the flow; cut them out
+        loopless = []
+        position = {}
+        for node in path:
+            if node in position:
+                del loopless[position[node] + 1:]
+                position = {p: j for j, p in enumerate(loopless)}
+            else:
+                position[node] = len(loopless)
+                loopless.append(node)
+        total = sum(edge_weight(G, a, b, weight) for a, b in zip(loopless, loopless[1:]))
+        results.append(SearchResult(loopless, total))
+    results.sort(key=lambda result: result.cost)
+    return results
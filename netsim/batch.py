@@ -0,0 +1,118 @@
+"""Many shortest-path queries at once.
+
+Pairs are grouped by source so each source's Dijkstra tree is grown once
+(and only as far as its farthest target) for all of its targets. Distinct
+sources are independent, so they are spread over a process pool; the graph
+is pickled to each worker once, in the pool initializer, not per task.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+
+from netsim.exceptions import NoPathError
+from netsim.shortest_path import ShortestPathTree
+
+# Below this many distinct sources a pool costs more to start than it saves.
+MIN_PARALLEL_SOURCES = 8
+
+
+@dataclass
+class RouteResult:
+    """Answer to one query; ``path`` is ``None`` when the target is unreachable."""
+
+    source: object
+    target: object
+    cost: float = None
+    path: list = None
+
+    @property
+    def hops(self):
+        return None if self.path is None else len(self.path) - 1
+
+    def as_row(self):
+        """The result as a flat, table-friendly dict."""
+        return {
+            "source": self.source,
+            "target": self.target,
+            "cost": self.cost,
+            "hops": self.hops,
+            "path": "" if self.path is None else " → ".join(map(str, self.path)),
+        }
+
+
+def all_pairs(sources, targets):
+    """Every ``(source, target)`` combination, skipping ``source == target``."""
+    return [(s, t) for s, t in product(sources, targets) if s != t]
+
+
+def group_by_source(pairs):
+    """Map each source to its ``(position, target)`` list, in input order."""
+    groups = {}
+    for position, (source, target) in enumerate(pairs):
+        groups.setdefault(source, []).append((position, target))
+    return groups
+
+
+def _solve(G, source, targets, weight):
+    try:
+        tree = ShortestPathTree(G, source, weight=weight)
+    except NoPathError:
+        return [(position, RouteResult(source, target)) for position, target in targets]
+    results = []
+    for position, target in targets:
+        if target not in G:
+            results.append((position, RouteResult(source, target)))
+            continue
+        tree.search(G, target)
+        if target in tree.position:
+            results.append((position, RouteResult(source, target, tree.dist[target], tree.path_to(target))))
+        else:
+            results.append((position, RouteResult(source, target)))
+    return results
+
+
+# The graph each pool worker answers queries on, set by _init_worker.
+_worker_graph = None
+
+
+def _init_worker(G):
+    global _worker_graph
+    _worker_graph = G
+
+
+def _solve_chunk(chunk, weight):
+    results = []
+    for source, targets in chunk:
+        results.extend(_solve(_worker_graph, source, targets, weight))
+    return results
+
+
+def batch_routes(G, pairs, workers=None, weight="weight", chunks_per_worker=4):
+    """Answer every ``(source, target)`` query in ``pairs``.
+
+    Returns one :class:`RouteResult` per pair, in the order of ``pairs``.
+    ``workers`` is the process count (default: one per CPU); with ``1``, or
+    too few distinct sources to be worth it, everything runs in-process.
+    """
+    pairs = list(pairs)
+    groups = group_by_source(pairs)
+    workers = workers or os.cpu_count() or 1
+    results = [None] * len(pairs)
+
+    if workers <= 1 or len(groups) < MIN_PARALLEL_SOURCES:
+        for source, targets in groups.items():
+            for position, result in _solve(G, source, targets, weight):
+                results[position] = result
+        return results
+
+    # Round-robin the sources into chunks so heavy and light sources mix.
+    items = list(groups.items())
+    count = min(len(items), workers * chunks_per_worker)
+    chunks = [items[i::count] for i in range(count)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(G,)) as pool:
+        for chunk_results in pool.map(_solve_chunk, chunks, [weight] * len(chunks)):
+            for position, result in chunk_results:
+                results[position] = result
+    return results
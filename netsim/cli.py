@@ -0,0 +1,140 @@
+"""Command-line interface: ``python -m netsim <command> GRAPH ...``.
+
+Runs routing queries on a graph file without Streamlit or NetworkX, for
+shell scripts and cron jobs. Results go to stdout (``--json`` for machine
+readable output); problems go to stderr with a non-zero exit status.
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+from netsim.exceptions import NetsimError
+from netsim.graph_io import FORMATS, iter_node_coordinates, iter_pairs, read_graph
+
+METHODS = ("dijkstra", "bidirectional", "astar")
+
+
+def _load(args):
+    if args.graph == "-":
+        return read_graph(sys.stdin.buffer, args.format)
+    return read_graph(args.graph, args.format)
+
+
+def _emit(args, data, text):
+    print(json.dumps(data) if args.json else text)
+
+
+def _info(args):
+    G = _load(args)
+    _emit(args, {"nodes": G.number_of_nodes(), "edges": G.number_of_edges()},
+          f"{G.number_of_nodes():,} nodes, {G.number_of_edges():,} edges")
+
+
+def _path(args):
+    from netsim.shortest_path import astar, bidirectional_dijkstra, dijkstra
+
+    G = _load(args)
+    if args.method == "astar":
+        from netsim.heuristics import coordinate_scale, haversine, make_heuristic
+
+        with open(args.coords, "rb") as stream:
+            coords = {node: (lat, lon) for node, lat, lon in iter_node_coordinates(stream)}
+        scale = coordinate_scale(G, coords, haversine)
+        result = astar(G, args.source, args.target, make_heuristic(coords, args.target, scale, haversine))
+    elif args.method == "bidirectional":
+        result = bidirectional_dijkstra(G, args.source, args.target)
+    else:
+        result = dijkstra(G, args.source, args.target).query(G, args.target)
+    _emit(
+        args,
+        {"path": result.path, "cost": result.cost, "hops": len(result.path) - 1, "explored": len(result.explored)},
+        f"{' → '.join(result.path)}\n"
+        f"cost {result.cost:g}, {len(result.path) - 1} hops, {len(result.explored):,} nodes explored",
+    )
+
+
+def _critical(args):
+    from netsim.critical_path import critical_path
+
+    G = _load(args)
+    result = critical_path(G, source=args.source, target=args.target)
+    _emit(
+        args,
+        {"path": result.path, "length": result.length, "slack": result.slack},
+        f"{' → '.join(result.path)}\nlength {result.length:g}",
+    )
+
+
+def _batch(args):
+    from netsim.batch import all_pairs, batch_routes
+
+    G = _load(args)
+    if args.pairs:
+        with open(args.pairs, "rb") as stream:
+            pairs = list(iter_pairs(stream))
+    else:
+        pairs = all_pairs(args.sources.split(","), args.targets.split(","))
+    results = batch_routes(G, pairs, workers=args.workers)
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.json:
+            for result in results:
+                out.write(json.dumps(result.as_row()) + "\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=["source", "target", "cost", "hops", "path"])
+            writer.writeheader()
+            writer.writerows(result.as_row() for result in results)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m netsim", description=__doc__.split("\n\n")[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("graph", help="graph file, or - for stdin (then --format is required)")
+    common.add_argument("--format", choices=sorted(FORMATS), help="graph file format (default: from the extension)")
+    common.add_argument("--json", action="store_true", help="print JSON instead of text")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info = commands.add_parser("info", parents=[common], help="count nodes and edges")
+    info.set_defaults(run=_info)
+
+    path = commands.add_parser("path", parents=[common], help="shortest path between two nodes")
+    path.add_argument("source")
+    path.add_argument("target")
+    path.add_argument("--method", choices=METHODS, default="dijkstra")
+    path.add_argument("--coords", help="node,lat,lon CSV for --method astar")
+    path.set_defaults(run=_path)
+
+    critical = commands.add_parser("critical", parents=[common], help="critical (longest) path of a DAG")
+    critical.add_argument("--source")
+    critical.add_argument("--target")
+    critical.set_defaults(run=_critical)
+
+    batch = commands.add_parser("batch", parents=[common], help="shortest paths for many pairs, as CSV")
+    pairs = batch.add_mutually_exclusive_group(required=True)
+    pairs.add_argument("--pairs", help="file of source,target pairs")
+    pairs.add_argument("--sources", help="comma-separated sources (with --targets: every combination)")
+    batch.add_argument("--targets", help="comma-separated targets")
+    batch.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    batch.add_argument("--output", help="write to this file instead of stdout")
+    batch.set_defaults(run=_batch)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "path" and args.method == "astar" and not args.coords:
+        parser.error("--method astar needs --coords")
+    if args.command == "batch" and args.sources and not args.targets:
+        parser.error("--sources needs --targets")
+    try:
+        args.run(args)
+    except (NetsimError, ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
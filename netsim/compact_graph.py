@@ -0,0 +1,380 @@
+"""Array-backed directed graph in compressed sparse row (CSR) form.
+
+Node names are interned to consecutive integer ids. Out-edges of node ``i``
+are ``targets[offsets[i]:offsets[i + 1]]`` (sorted by target id) with the
+matching ``weights``; in-edges come from a reverse index built on demand.
+Edges added one at a time wait in a small dict-of-dicts overflow that
+every lookup checks alongside the arrays, so adding one costs a dict
+insert; the overflow is only merged into the arrays once it is large, or
+when the arrays are needed whole (:meth:`CompactGraph.csr`, pickling).
+Compared with the dict-of-dicts of ``nx.DiGraph`` this needs a few bytes per
+edge, pickles as a handful of flat buffers, and is what large imported
+topologies are kept in.
+
+The class mirrors the read/write subset of the ``nx.DiGraph`` API that the
+app and the engine use, and converts to NetworkX for anything else.
+"""
+
+import numpy as np
+
+# Overflow edges are merged into the arrays once they reach this many, and bulk
+# loads are merged in chunks of this size, so neither holds more than this in
+# Python objects.
+COMPACT_THRESHOLD = 100_000
+
+
+class CompactGraph:
+    """Directed graph with one float weight per edge, stored as CSR arrays."""
+
+    def __init__(self, weight_dtype=np.float64):
+        self.weight_dtype = np.dtype(weight_dtype)
+        self._names = []
+        self._ids = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._targets = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=self.weight_dtype)
+        self._scalar = self.weight_dtype.type
+        # Edges added since the last compaction and not in the arrays, as
+        # {source id: {target id: weight}}, plus the same by target, built
+        # on demand.
+        self._overflow = {}
+        self._overflow_edges = 0
+        self._overflow_in = None
+        self._reverse = None
+
+    @classmethod
+    def from_edges(cls, edges, weight_dtype=np.float64):
+        """Build a graph from ``(source, target, weight)`` triples."""
+        graph = cls(weight_dtype)
+        graph.add_weighted_edges_from(edges)
+        return graph
+
+    @classmethod
+    def from_networkx(cls, G, weight="weight", weight_dtype=np.float64):
+        """Copy ``G`` (any NetworkX digraph) into a new compact graph."""
+        graph = cls(weight_dtype)
+        graph.add_nodes_from(G.nodes())
+        graph.add_weighted_edges_from((u, v, d.get(weight, 1)) for u, v, d in G.edges(data=True))
+        return graph
+
+    @classmethod
+    def from_arrays(cls, names, offsets, targets, weights, reverse=None):
+        """Wrap existing CSR arrays (e.g. memory-mapped ones) without copying them.
+
+        ``reverse`` is an optional precomputed :meth:`reverse_csr` triple.
+        Read-only arrays are fine: adding edges builds new arrays, and
+        re-weighting one in place copies the weights first. The name → id
+        index is only built on the first lookup.
+        """
+        graph = cls(weights.dtype)
+        graph._names = names if isinstance(names, list) else list(names)
+        del graph._ids
+        graph._offsets = offsets
+        graph._targets = targets
+        graph._weights = weights
+        graph._reverse = reverse
+        return graph
+
+    def to_networkx(self):
+        """Return an equivalent ``nx.DiGraph``, for algorithms only NetworkX has."""
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self._names)
+        G.add_weighted_edges_from(self.edges(data="weight"))
+        return G
+
+    # -- pickling -----------------------------------------------------------
+
+    def __getstate__(self):
+        self._compact()
+        state = self.__dict__.copy()
+        # Both are derived data and cheap to rebuild.
+        state.pop("_ids", None)
+        state["_reverse"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def __getattr__(self, name):
+        # Only reached while the name → id index is missing (after unpickling
+        # or from_arrays); it is built once, then found as a plain attribute.
+        if name == "_ids":
+            ids = self.__dict__["_ids"] = dict(zip(self._names, range(len(self._names))))
+            return ids
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    # -- nodes --------------------------------------------------------------
+
+    def _intern(self, node):
+        i = self._ids.get(node)
+        if i is None:
+            i = self._ids[node] = len(self._names)
+            self._names.append(node)
+        return i
+
+    def add_node(self, node):
+        self._intern(node)
+
+    def add_nodes_from(self, nodes):
+        for node in nodes:
+            self._intern(node)
+
+    def __contains__(self, node):
+        return node in self._ids
+
+    has_node = __contains__
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def nodes(self):
+        return list(self._names)
+
+    def number_of_nodes(self):
+        return len(self._names)
+
+    def node_id(self, node):
+        """Return the interned integer id of ``node``."""
+        return self._ids[node]
+
+    def node_name(self, i):
+        """Return the node whose interned id is ``i``."""
+        return self._names[i]
+
+    # -- edges --------------------------------------------------------------
+
+    def _slot(self, i, j):
+        """Return the array position of edge ``i → j``, or ``None``."""
+        if i + 1 >= len(self._offsets):
+            return None
+        start, end = self._offsets[i], self._offsets[i + 1]
+        pos = start + int(np.searchsorted(self._targets[start:end], j))
+        if pos < end and self._targets[pos] == j:
+            return pos
+        return None
+
+    def add_edge(self, u, v, weight=1.0):
+        i, j = self._intern(u), self._intern(v)
+        # Re-weighting an edge already in the arrays is done in place.
+        pos = self._slot(i, j)
+        if pos is not None:
+            if not self._weights.flags.writeable:
+                self._weights = np.array(self._weights)
+            self._weights[pos] = weight
+            return
+        self._put(i, j, weight)
+        if self._overflow_edges >= COMPACT_THRESHOLD:
+            self._compact()
+
+    def add_weighted_edges_from(self, edges):
+        # Bulk loads skip the overflow and go straight into the arrays
+        intern = self._intern
+        src, tgt, wgt = [], [], []
+        for u, v, w in edges:
+            src.append(intern(u))
+            tgt.append(intern(v))
+            wgt.append(w)
+            if len(src) >= COMPACT_THRESHOLD:
+                self._compact((src, tgt, wgt))
+                src, tgt, wgt = [], [], []
+        self._compact((src, tgt, wgt))
+
+    def _put(self, i, j, weight):
+        # Stored as the arrays would store it, so compacting changes nothing
+        weight = self._scalar(weight).item()
+        row = self._overflow.get(i)
+        if row is None:
+            row = self._overflow[i] = {}
+        if j not in row:
+            self._overflow_edges += 1
+        row[j] = weight
+        if self._overflow_in is not None:
+            self._overflow_in.setdefault(j, {})[i] = weight
+
+    def _incoming(self):
+        """The overflow indexed by target, as ``{target id: {source id: weight}}``."""
+        if self._overflow_in is None:
+            incoming = self._overflow_in = {}
+            for i, row in self._overflow.items():
+                for j, w in row.items():
+                    incoming.setdefault(j, {})[i] = w
+        return self._overflow_in
+
+    def _compact(self, added=None):
+        """Merge the overflow, then the ``(sources, targets, weights)`` lists
+        ``added``, into the CSR arrays (of several copies of an edge the last wins)."""
+        if not self._overflow_edges and not (added and added[0]):
+            return
+        n = len(self._names)
+        counts = np.diff(self._offsets)
+        new_src, new_tgt, new_wgt = [], [], []
+        for i, row in self._overflow.items():
+            new_src.extend([i] * len(row))
+            new_tgt.extend(row)
+            new_wgt.extend(row.values())
+        if added:
+            new_src.extend(added[0])
+            new_tgt.extend(added[1])
+            new_wgt.extend(added[2])
+        src = np.concatenate([np.repeat(np.arange(len(counts), dtype=np.int32), counts),
+                              np.array(new_src, dtype=np.int32)])
+        tgt = np.concatenate([self._targets, np.array(new_tgt, dtype=np.int32)])
+        wgt = np.concatenate([self._weights, np.array(new_wgt, dtype=self.weight_dtype)])
+        # lexsort is stable, so of several copies of an edge the newest sorts last.
+        order = np.lexsort((tgt, src))
+        src, tgt, wgt = src[order], tgt[order], wgt[order]
+        keep = np.ones(len(src), dtype=bool)
+        keep[:-1] = (src[1:] != src[:-1]) | (tgt[1:] != tgt[:-1])
+        src, self._targets, self._weights = src[keep], tgt[keep], wgt[keep]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        self._offsets = offsets
+        self._overflow = {}
+        self._overflow_edges = 0
+        self._overflow_in = None
+        self._reverse = None
+
+    def _grow_offsets(self):
+        # Nodes interned after the last compaction have empty rows.
+        missing = len(self._names) + 1 - len(self._offsets)
+        if missing > 0:
+            self._offsets = np.concatenate([self._offsets, np.full(missing, self._offsets[-1])])
+            self._reverse = None
+
+    def csr(self):
+        """Return the ``(offsets, targets, weights)`` arrays, compacting first."""
+        self._compact()
+        self._grow_offsets()
+        return self._offsets, self._targets, self._weights
+
+    def reverse_csr(self):
+        """Return ``(offsets, sources, edge_positions)`` indexing in-edges by target."""
+        self.csr()
+        return self._reverse_index()
+
+    def _reverse_index(self):
+        # Over the arrays as they are, covering the nodes they have rows for
+        if self._reverse is None:
+            offsets, targets = self._offsets, self._targets
+            n = len(offsets) - 1
+            order = np.argsort(targets, kind="stable").astype(np.int32)
+            counts = np.diff(offsets)
+            src = np.repeat(np.arange(n, dtype=np.int32), counts)
+            roffsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(targets, minlength=n), out=roffsets[1:])
+            self._reverse = (roffsets, src[order], order)
+        return self._reverse
+
+    def number_of_edges(self):
+        return len(self._targets) + self._overflow_edges
+
+    def has_edge(self, u, v):
+        return self.get_edge_data(u, v) is not None
+
+    def get_edge_data(self, u, v, default=None):
+        i, j = self._ids.get(u), self._ids.get(v)
+        if i is None or j is None:
+            return default
+        row = self._overflow.get(i)
+        if row is not None and j in row:
+            return {"weight": row[j]}
+        pos = self._slot(i, j)
+        if pos is None:
+            return default
+        return {"weight": float(self._weights[pos])}
+
+    def weighted_successors(self, u):
+        i = self._ids[u]
+        names = self._names
+        pairs = []
+        if i + 1 < len(self._offsets):
+            start, end = self._offsets[i], self._offsets[i + 1]
+            pairs = [(names[j], w) for j, w in zip(self._targets[start:end].tolist(), self._weights[start:end].tolist())]
+        row = self._overflow.get(i)
+        if row:
+            pairs.extend((names[j], w) for j, w in row.items())
+        return pairs
+
+    def weighted_predecessors(self, v):
+        j = self._ids[v]
+        names = self._names
+        pairs = []
+        roffsets, sources, positions = self._reverse_index()
+        if j + 1 < len(roffsets):
+            start, end = roffsets[j], roffsets[j + 1]
+            weights = self._weights[positions[start:end]].tolist()
+            pairs = [(names[i], w) for i, w in zip(sources[start:end].tolist(), weights)]
+        if self._overflow_edges:
+            row = self._incoming().get(j)
+            if row:
+                pairs.extend((names[i], w) for i, w in row.items())
+        return pairs
+
+    def __getitem__(self, u):
+        return {v: {"weight": w} for v, w in self.weighted_successors(u)}
+
+    def out_degree(self, u):
+        i = self._ids[u]
+        offsets = self._offsets
+        degree = int(offsets[i + 1] - offsets[i]) if i + 1 < len(offsets) else 0
+        return degree + len(self._overflow.get(i, ()))
+
+    def in_degree(self, v):
+        j = self._ids[v]
+        roffsets = self._reverse_index()[0]
+        degree = int(roffsets[j + 1] - roffsets[j]) if j + 1 < len(roffsets) else 0
+        if self._overflow_edges:
+            degree += len(self._incoming().get(j, ()))
+        return degree
+
+    def edges(self, data=False):
+        """Iterate edges like ``nx.DiGraph.edges``.
+
+        ``data=True`` yields ``(u, v, {"weight": w})`` and ``data="weight"``
+        yields ``(u, v, w)``. Edges still in the overflow come last.
+        """
+        names = self._names
+        counts = np.diff(self._offsets).tolist()
+        dst = iter(self._targets.tolist())
+        wgt = iter(self._weights.tolist())
+        triples = (
+            (names[i], names[next(dst)], next(wgt)) for i, count in enumerate(counts) for _ in range(count)
+        )
+        overflow = ((names[i], names[j], w) for i, row in list(self._overflow.items()) for j, w in list(row.items()))
+        for source in (triples, overflow):
+            for u, v, w in source:
+                if data is True:
+                    yield u, v, {"weight": w}
+                elif data:
+                    yield u, v, w
+                else:
+                    yield u, v
+
+    # -- bookkeeping --------------------------------------------------------
+
+    @property
+    def nbytes(self):
+        """Bytes held by the CSR arrays (excluding node names)."""
+        total = self._offsets.nbytes + self._targets.nbytes + self._weights.nbytes
+        if self._reverse is not None:
+            total += sum(a.nbytes for a in self._reverse)
+        return total
+
+    def copy(self):
+        graph = CompactGraph(self.weight_dtype)
+        graph._names = list(self._names)
+        graph._ids = dict(self._ids)
+        graph._offsets = self._offsets.copy()
+        graph._targets = self._targets.copy()
+        graph._weights = self._weights.copy()
+        graph._overflow = {i: dict(row) for i, row in self._overflow.items()}
+        graph._overflow_edges = self._overflow_edges
+        return graph
+
+    def __repr__(self):
+        return f"CompactGraph(nodes={self.number_of_nodes()}, edges={self.number_of_edges()})"
@@ -0,0 +1,303 @@
+"""Strongly connected components, their condensation and reachability.
+
+:class:`ComponentIndex` collapses every strongly connected component (SCC)
+of the graph into one node of the condensation, a DAG, and keeps the DAG in
+a topological order. A node can only reach nodes whose component comes
+later in that order, so most "is there a path at all?" questions are
+answered by comparing two positions; the rest search the condensation,
+which is usually far smaller than the graph.
+
+Adding an edge updates the index in place. An edge that agrees with the
+order just joins the DAG. One that goes against it reorders only the
+components between its endpoints (Pearce & Kelly's dynamic topological
+sort), and if it closes a cycle, merges the components on that cycle.
+"""
+
+from collections import OrderedDict
+
+from netsim.adjacency import successors
+from netsim.exceptions import CycleError, NoPathError
+
+# Source components whose full reach is remembered between queries
+REACH_CACHE = 64
+
+
+class ComponentIndex:
+    """SCC condensation of ``G`` in topological order, answering reachability.
+
+    ``version`` tags the graph version the index matches; like
+    :class:`~netsim.distance_index.DistanceIndex`, the owner reports added
+    edges through :meth:`edge_added` and calls :meth:`sync` otherwise.
+    """
+
+    def __init__(self, G, version=0):
+        self.version = version
+        self.build(G)
+
+    def build(self, G):
+        """(Re)compute the components of ``G`` from scratch (Tarjan's algorithm)."""
+        succ = successors(G)
+        self.component = {}
+        self.members = {}
+        self.succ = {}
+        self.pred = {}
+        self.position = {}
+        # Components that contain a cycle: several nodes, or one with a self-loop
+        self.cyclic = set()
+        self._reach = OrderedDict()
+
+        index, low = {}, {}
+        stack, on_stack = [], set()
+        found = []
+        for root in G.nodes():
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(succ(root)))]
+            while work:
+                u, edges = work[-1]
+                for v, _ in edges:
+                    if v not in index:
+                        index[v] = low[v] = len(index)
+                        stack.append(v)
+                        on_stack.add(v)
+                        work.append((v, iter(succ(v))))
+                        break
+                    if v in on_stack and index[v] < low[u]:
+                        low[u] = index[v]
+                else:
+                    work.pop()
+                    if work and low[u] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[u]
+                    if low[u] == index[u]:
+                        c = len(found)
+                        members = []
+                        while True:
+                            v = stack.pop()
+                            on_stack.discard(v)
+                            self.component[v] = c
+                            members.append(v)
+                            if v == u:
+                                break
+                        found.append(members)
+
+        # Tarjan finishes components in reverse topological order
+        for c, members in enumerate(found):
+            self.members[c] = members
+            self.position[c] = len(found) - 1 - c
+            self.succ[c] = set()
+            self.pred[c] = set()
+            if len(members) > 1:
+                self.cyclic.add(c)
+        for u, c in self.component.items():
+            for v, _ in succ(u):
+                d = self.component[v]
+                if d != c:
+                    self.succ[c].add(d)
+                    self.pred[d].add(c)
+                elif u == v:
+                    self.cyclic.add(c)
+        self._next_id = self._next_position = len(found)
+
+    def __len__(self):
+        return len(self.members)
+
+    def sync(self, G, version):
+        """Rebuild from ``G`` if ``version`` differs from the index's."""
+        if version != self.version:
+            self.build(G)
+            self.version = version
+
+    def edge_added(self, G, u, v, version=None):
+        """Bring the index up to date after ``G`` gained edge ``u → v``.
+
+        ``version`` is the graph version after the change; the index is only
+        updated in place if it was current for the version just before it,
+        otherwise it is rebuilt as in :meth:`sync`.
+        """
+        if version is not None:
+            if version - 1 != self.version:
+                self.sync(G, version)
+                return
+            self.version = version
+        self._add_edge(u, v)
+
+    def _component_of(self, node):
+        c = self.component.get(node)
+        if c is None:
+            c = self.component[node] = self._next_id
+            self._next_id += 1
+            self.members[c] = [node]
+            self.succ[c] = set()
+            self.pred[c] = set()
+            # Unconnected, so anywhere in the order will do
+            self.position[c] = self._next_position
+            self._next_position += 1
+        return c
+
+    def _add_edge(self, u, v):
+        cu, cv = self._component_of(u), self._component_of(v)
+        if cu == cv:
+            if u == v:
+                self.cyclic.add(cu)
+            return
+        if cv in self.succ[cu]:
+            return
+        self._reach.clear()
+        position = self.position
+        self.succ[cu].add(cv)
+        self.pred[cv].add(cu)
+        if position[cu] < position[cv]:
+            return
+
+        # Only components between cv and cu in the order can be affected:
+        # those cv reaches and those reaching cu
+        lower, upper = position[cv], position[cu]
+        forward = self._search(cv, self.succ, lambda c: position[c] <= upper)
+        backward = self._search(cu, self.pred, lambda c: position[c] >= lower)
+        slots = sorted(position[c] for c in forward | backward)
+        # Everything cv reaches that also reaches cu is now on a cycle with the edge
+        on_cycle = forward & backward
+        before = sorted(backward - on_cycle, key=position.__getitem__)
+        after = sorted(forward - on_cycle, key=position.__getitem__)
+        for c, slot in zip(before, slots):
+            position[c] = slot
+        for c, slot in zip(after, slots[len(slots) - len(after):]):
+            position[c] = slot
+        if on_cycle:
+            position[self._merge(on_cycle)] = slots[len(before)]
+
+    @staticmethod
+    def _search(start, edges, within):
+        seen = {start}
+        stack = [start]
+        while stack:
+            c = stack.pop()
+            for d in edges[c]:
+                if d not in seen and within(d):
+                    seen.add(d)
+                    stack.append(d)
+        return seen
+
+    def _merge(self, merged):
+        """Fold the components ``merged`` into the largest of them and return it."""
+        keep = max(merged, key=lambda c: len(self.members[c]))
+        for c in merged:
+            if c == keep:
+                continue
+            for node in self.members[c]:
+                self.component[node] = keep
+            self.members[keep].extend(self.members.pop(c))
+            for d in self.succ.pop(c):
+                self.pred[d].discard(c)
+                if d not in merged:
+                    self.succ[keep].add(d)
+                    self.pred[d].add(keep)
+            for d in self.pred.pop(c):
+                self.succ[d].discard(c)
+                if d not in merged:
+                    self.pred[keep].add(d)
+                    self.succ[d].add(keep)
+            del self.position[c]
+            self.cyclic.discard(c)
+        self.succ[keep] -= merged
+        self.pred[keep] -= merged
+        self.cyclic.add(keep)
+        return keep
+
+    def reach(self, source):
+        """Components reachable from ``source``'s component, itself included."""
+        c = self.component[source]
+        reached = self._reach.get(c)
+        if reached is None:
+            reached = self._reach[c] = frozenset(self._search(c, self.succ, lambda d: True))
+            if len(self._reach) > REACH_CACHE:
+                self._reach.popitem(last=False)
+        else:
+            self._reach.move_to_end(c)
+        return reached
+
+    def reaches(self, source, target):
+        """Whether ``G`` has a path from ``source`` to ``target``."""
+        cs, ct = self.component.get(source), self.component.get(target)
+        if cs is None or ct is None:
+            return False
+        if cs == ct:
+            return True
+        if self.position[cs] > self.position[ct]:
+            return False
+        return ct in self.reach(source)
+
+    def check_path(self, source, target):
+        """Raise :class:`NoPathError` unless ``source`` reaches ``target``."""
+        if not self.reaches(source, target):
+            raise NoPathError(f"No path exists between {source!r} and {target!r}")
+
+    def find_cycle(self, G, source=None):
+        """Return the nodes of one cycle of ``G`` in order, or ``None`` if it is acyclic.
+
+        With ``source`` only the part of the graph reachable from it is
+        considered, as in :func:`~netsim.critical_path.critical_path`.
+        """
+        cyclic = self.cyclic
+        if source is not None:
+            cyclic = cyclic & self.reach(source)
+        if not cyclic:
+            return None
+        # Walk inside the component from one member until an edge leads back
+        members = self.members[next(iter(cyclic))]
+        inside = set(members)
+        start = members[0]
+        succ = successors(G)
+        parent = {start: None}
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for v, _ in succ(u):
+                if v == start:
+                    cycle = [u]
+                    while parent[cycle[-1]] is not None:
+                        cycle.append(parent[cycle[-1]])
+                    cycle.reverse()
+                    return cycle
+                if v in inside and v not in parent:
+                    parent[v] = u
+                    stack.append(v)
+        return None
+
+    def check_acyclic(self, G, source=None):
+        """Raise :class:`CycleError` if :meth:`find_cycle` finds a cycle."""
+        cycle = self.find_cycle(G, source)
+        if cycle is not None:
+            raise CycleError(cycle)
+
+    def summary(self):
+        """Counts describing the component structure, as a dict."""
+        sizes = [len(members) for members in self.members.values()]
+        return {
+            "nodes": len(self.component),
+            "components": len(sizes),
+            "largest": max(sizes, default=0),
+            "singletons": sum(1 for size in sizes if size == 1),
+            "cyclic": len(self.cyclic),
+            "condensation_edges": sum(len(edges) for edges in self.succ.values()),
+        }
+
+    def component_rows(self, limit=20, sample=5):
+        """Table rows for the ``limit`` largest components, in topological order."""
+        largest = sorted(self.members, key=lambda c: -len(self.members[c]))[:limit]
+        largest.sort(key=self.position.__getitem__)
+        return [
+            {
+                "component": c,
+                "nodes": len(self.members[c]),
+                "cyclic": c in self.cyclic,
+                "feeds": len(self.succ[c]),
+                "fed by": len(self.pred[c]),
+                "members": ", ".join(map(str, self.members[c][:sample]))
+                + (" …" if len(self.members[c]) > sample else ""),
+            }
+            for c in largest
+        ]
@@ -0,0 +1,223 @@
+"""Contraction hierarchies for fast repeat shortest-path queries.
+
+Preprocessing removes ("contracts") the nodes one at a time, least
+important first, adding a shortcut ``u → x`` whenever a shortest route
+``u → v → x`` would otherwise be lost with ``v``. A short local Dijkstra
+(the witness search) skips the shortcuts that another route already makes
+redundant. Afterwards every shortest path can be found by a bidirectional
+search that only ever climbs to more important nodes, which settles a few
+hundred nodes even on very large road-like graphs. Shortcuts remember the
+node they bypass, so results unpack into ordinary graph paths.
+
+The hierarchy is a snapshot: build a new one when the graph changes.
+"""
+
+import math
+from heapq import heapify, heappop, heappush
+from itertools import count
+
+from netsim.adjacency import edge_weight, successors
+from netsim.exceptions import NoPathError
+from netsim.shortest_path import SearchResult
+
+# Nodes a witness search may settle before giving up (and adding the shortcut)
+WITNESS_LIMIT = 60
+# The same while only estimating a node's priority, which happens far more often
+PRIORITY_WITNESS_LIMIT = 10
+
+
+class ContractionHierarchy:
+    """Shortcut index over ``G`` answering :meth:`query` like a Dijkstra search.
+
+    ``witness_limit`` bounds each witness search; a lower one builds faster
+    but adds more (harmless) shortcuts.
+    """
+
+    def __init__(self, G, weight="weight", witness_limit=WITNESS_LIMIT):
+        self.weight = weight
+        self.names = list(G.nodes())
+        self.ids = {node: i for i, node in enumerate(self.names)}
+        n = len(self.names)
+        ids = self.ids
+        succ = successors(G, weight)
+
+        # Remaining graph, both directions, as {neighbour: weight} per node
+        out = [{} for _ in range(n)]
+        inc = [{} for _ in range(n)]
+        for u, node in enumerate(self.names):
+            for v, w in succ(node):
+                v = ids[v]
+                if v != u and w < out[u].get(v, math.inf):
+                    out[u][v] = w
+                    inc[v][u] = w
+
+        # Upward edges (to more important nodes) for the forward search, and
+        # reversed downward edges for the backward search
+        self.up = [()] * n
+        self.down = [()] * n
+        # Node bypassed by each shortcut
+        self.middle = {}
+        self.rank = [0] * n
+        self.shortcuts = 0
+        contracted_neighbours = [0] * n
+
+        def needed(v, settle_limit=witness_limit):
+            """Shortcuts that contracting ``v`` now would need, as ``(u, x, weight)``."""
+            found = []
+            targets = out[v]
+            for u, wu in inc[v].items():
+                limit = wu + max((w for x, w in targets.items() if x != u), default=0)
+                witness = self._witness(out, u, v, targets, limit, settle_limit)
+                for x, wx in targets.items():
+                    if x != u and wu + wx < witness.get(x, math.inf):
+                        found.append((u, x, wu + wx))
+            return found
+
+        def priority(v):
+            # Edge difference plus how many neighbours are already gone, which
+            # spreads contraction evenly over the graph
+            return len(needed(v, PRIORITY_WITNESS_LIMIT)) - len(out[v]) - len(inc[v]) + contracted_neighbours[v]
+
+        # Priorities are refreshed for the neighbours of every contracted
+        # node; heap entries older than a node's current priority are skipped
+        tie = count()
+        current = [priority(v) for v in range(n)]
+        heap = [(p, next(tie), v) for v, p in enumerate(current)]
+        heapify(heap)
+        level = 0
+        while heap:
+            p, _, v = heappop(heap)
+            if out[v] is None or p != current[v]:
+                continue
+            for u, x, w in needed(v):
+                if w < out[u].get(x, math.inf):
+                    out[u][x] = w
+                    inc[x][u] = w
+                    self.middle[u, x] = v
+                    self.shortcuts += 1
+            self.rank[v] = level
+            level += 1
+            self.up[v] = tuple(out[v].items())
+            self.down[v] = tuple(inc[v].items())
+            neighbours = set(out[v]) | set(inc[v])
+            for x in out[v]:
+                del inc[x][v]
+            for u in inc[v]:
+                del out[u][v]
+            out[v] = inc[v] = None
+            for u in neighbours:
+                contracted_neighbours[u] += 1
+                current[u] = priority(u)
+                heappush(heap, (current[u], next(tie), u))
+
+    @staticmethod
+    def _witness(out, source, avoid, targets, limit, settle_limit):
+        """Distances from ``source`` without passing ``avoid``, up to ``limit``."""
+        dist = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+        remaining = len(targets)
+        while heap and settled < settle_limit and remaining:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if u in targets:
+                remaining -= 1
+            for v, w in out[u].items():
+                if v == avoid:
+                    continue
+                nd = d + w
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    heappush(heap, (nd, v))
+        return dist
+
+    def __len__(self):
+        return len(self.names)
+
+    def _unpack(self, path):
+        """Replace shortcuts in an id path by the edges they stand for."""
+        middle = self.middle
+        unpacked = [path[0]]
+        stack = list(zip(path[1:], path))[::-1]
+        while stack:
+            v, u = stack.pop()
+            m = middle.get((u, v))
+            if m is None:
+                unpacked.append(v)
+            else:
+                stack.append((v, m))
+                stack.append((m, u))
+        return unpacked
+
+    def query(self, source, target, G=None):
+        """Return the shortest ``source → target`` path as a :class:`SearchResult`.
+
+        ``explored`` lists the hierarchy nodes both searches settled. The
+        cost is summed over the unpacked path's edges in ``G`` when given,
+        so it matches a plain search on ``G`` to the last bit. Raises
+        :class:`NoPathError` if there is no path.
+        """
+        s, t = self.ids.get(source), self.ids.get(target)
+        if s is None or t is None:
+            raise NoPathError(f"No path exists between {source!r} and {target!r}")
+        if s == t:
+            return SearchResult([source], 0, [source])
+        graphs = (self.up, self.down)
+        # Stalling looks at the edges the other direction would use
+        stall = (self.down, self.up)
+        dist = ({s: 0}, {t: 0})
+        pred = ({}, {})
+        heaps = ([(0, s)], [(0, t)])
+        settled = (set(), set())
+        explored = []
+        seen = set()
+        relaxations = 0
+        max_frontier = 0
+        best, meet = math.inf, None
+        while True:
+            # Done once neither side's smallest key can beat the best meeting
+            forward = heaps[0][0][0] if heaps[0] else math.inf
+            backward = heaps[1][0][0] if heaps[1] else math.inf
+            if min(forward, backward) >= best:
+                break
+            side = 0 if forward <= backward else 1
+            d, u = heappop(heaps[side])
+            mine = dist[side]
+            if u in settled[side] or d > mine[u]:
+                continue
+            settled[side].add(u)
+            if u not in seen:
+                seen.add(u)
+                explored.append(u)
+            other = dist[1 - side]
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+            # Stall-on-demand: a higher node reaches u more cheaply, so u is
+            # not on any shortest up-path and need not be expanded
+            if any(v in mine and mine[v] + w < d for v, w in stall[side][u]):
+                continue
+            for v, w in graphs[side][u]:
+                relaxations += 1
+                nd = d + w
+                if nd < mine.get(v, math.inf):
+                    mine[v] = nd
+                    pred[side][v] = u
+                    heappush(heaps[side], (nd, v))
+            frontier = len(dist[0]) + len(dist[1]) - len(settled[0]) - len(settled[1])
+            max_frontier = max(max_frontier, frontier)
+        if meet is None:
+            raise NoPathError(f"No path exists between {source!r} and {target!r}")
+        path = [meet]
+        while path[-1] != s:
+            path.append(pred[0][path[-1]])
+        path.reverse()
+        while path[-1] != t:
+            path.append(pred[1][path[-1]])
+        names = self.names
+        path = [names[i] for i in self._unpack(path)]
+        cost = best if G is None else sum(edge_weight(G, u, v, self.weight) for u, v in zip(path, path[1:]))
+        return SearchResult(path, cost, [names[i] for i in explored], relaxations, max_frontier)
@@ -0,0 +1,151 @@
+"""Critical Path Method (CPM) on weighted DAGs.
+
+One topological sort followed by a forward and a backward pass gives the
+earliest start, latest start and slack of every task together with the
+longest (critical) path, all in O(V + E) and without copying the graph.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+
+from netsim.adjacency import predecessors, successors
+from netsim.exceptions import CycleError, NoPathError
+
+
+@dataclass
+class CriticalPathResult:
+    """Outcome of a CPM run.
+
+    ``order`` is the topological order the forward pass processed, which the
+    app replays as the exploration animation.
+    """
+
+    path: list
+    length: float
+    earliest_start: dict = field(default_factory=dict)
+    latest_start: dict = field(default_factory=dict)
+    slack: dict = field(default_factory=dict)
+    order: list = field(default_factory=list)
+
+
+def _reachable(succ, source):
+    seen = {source}
+    stack = [source]
+    while stack:
+        u = stack.pop()
+        for v, _ in succ(u):
+            if v not in seen:
+                seen.add(v)
+                stack.append(v)
+    return seen
+
+
+def _find_cycle(remaining, pred):
+    # Every node left over by Kahn's algorithm still has a predecessor among
+    # the leftovers, so walking predecessors must eventually repeat a node.
+    node = next(iter(remaining))
+    walk = {}
+    trail = []
+    while node not in walk:
+        walk[node] = len(trail)
+        trail.append(node)
+        node = next(p for p, _ in pred(node) if p in remaining)
+    cycle = trail[walk[node]:]
+    cycle.reverse()
+    return cycle
+
+
+def topological_order(G, nodes=None):
+    """Return the nodes of ``G`` (or of the subset ``nodes``) in topological order.
+
+    Raises :class:`CycleError` naming one cycle if the nodes are not acyclic.
+    """
+    succ, pred = successors(G), predecessors(G)
+    if nodes is None:
+        nodes = set(G)
+    indegree = {v: sum(1 for u, _ in pred(v) if u in nodes) for v in nodes}
+    queue = deque(v for v, d in indegree.items() if d == 0)
+    order = []
+    while queue:
+        u = queue.popleft()
+        order.append(u)
+        for v, _ in succ(u):
+            if v in indegree:
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    queue.append(v)
+    if len(order) < len(nodes):
+        remaining = {v for v, d in indegree.items() if d > 0}
+        raise CycleError(_find_cycle(remaining, pred))
+    return order
+
+
+def critical_path(G, source=None, target=None, weight="weight"):
+    """Run CPM on ``G`` and return a :class:`CriticalPathResult`.
+
+    With ``source`` the schedule starts at that node and only the part of the
+    graph reachable from it is considered (a cycle elsewhere does not matter).
+    With ``target`` the critical path ends there, otherwise at the task that
+    finishes last. Slack is reported for every task that lies on some path
+    into the end task.
+    """
+    succ = successors(G, weight)
+    if source is not None and source not in G:
+        raise NoPathError(f"Node {source!r} is not in the graph")
+    if target is not None and target not in G:
+        raise NoPathError(f"Node {target!r} is not in the graph")
+
+    nodes = _reachable(succ, source) if source is not None else None
+    order = topological_order(G, nodes)
+    in_scope = set(order)
+
+    # Forward pass: earliest start of every task.
+    earliest = dict.fromkeys(order, 0.0)
+    best_pred = {}
+    for u in order:
+        start = earliest[u]
+        for v, w in succ(u):
+            if v not in in_scope:
+                continue
+            finish = start + w
+            if v not in best_pred or finish > earliest[v]:
+                earliest[v] = finish
+                best_pred[v] = u
+
+    if target is None:
+        end = max(order, key=earliest.__getitem__)
+    elif target not in in_scope:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    else:
+        end = target
+
+    # Backward pass: latest start that does not delay the end task.
+    project_end = earliest[end]
+    latest = {end: project_end}
+    for u in reversed(order):
+        if u == end:
+            continue
+        bound = None
+        for v, w in succ(u):
+            if v in latest:
+                candidate = latest[v] - w
+                if bound is None or candidate < bound:
+                    bound = candidate
+        if bound is not None:
+            latest[u] = bound
+    slack = {u: latest[u] - earliest[u] for u in latest}
+
+    path = [end]
+    while path[-1] in best_pred:
+        path.append(best_pred[path[-1]])
+    path.reverse()
+
+    cut = order.index(end) + 1
+    return CriticalPathResult(
+        path=path,
+        length=project_end,
+        earliest_start=earliest,
+        latest_start=latest,
+        slack=slack,
+        order=order[:cut],
+    )
@@ -0,0 +1,65 @@
+"""Per-graph cache of shortest-path trees.
+
+The index is tagged with the version of the graph it was built against. The
+owner bumps the version whenever the graph changes and either reports the
+change through :meth:`edge_added`, which repairs the cached trees in place,
+or calls :meth:`sync`, which drops them if they no longer match.
+"""
+
+from netsim.adjacency import edge_weight
+from netsim.shortest_path import ShortestPathTree
+
+
+class DistanceIndex:
+    """Shortest-path trees keyed by source, reused across queries."""
+
+    def __init__(self, version=0, weight="weight"):
+        self.version = version
+        self.weight = weight
+        self.trees = {}
+
+    def __len__(self):
+        return len(self.trees)
+
+    def sync(self, version):
+        """Forget every cached tree if ``version`` differs from the index's."""
+        if version != self.version:
+            self.trees.clear()
+            self.version = version
+
+    def edge_added(self, G, u, v, old_weight=None, version=None):
+        """Bring the cached trees up to date after ``G`` gained edge ``u → v``.
+
+        ``old_weight`` is the edge's weight before the change, or ``None`` if
+        the edge is new. ``version`` is the graph version after the change;
+        the trees are only repaired if the index was current for the version
+        just before it, otherwise they are dropped as in :meth:`sync`.
+        """
+        if version is not None:
+            if version - 1 != self.version:
+                self.sync(version)
+                return
+            self.version = version
+        new_weight = edge_weight(G, u, v, self.weight)
+        for source, tree in list(self.trees.items()):
+            if old_weight is not None and new_weight > old_weight:
+                # A more expensive edge only matters if a tree path uses it.
+                if tree.pred.get(v) == u:
+                    del self.trees[source]
+            else:
+                tree.relax_edge(G, u, v, weight=self.weight)
+
+    def tree(self, G, source):
+        """Return the (possibly partial) search tree from ``source``."""
+        tree = self.trees.get(source)
+        if tree is None:
+            tree = self.trees[source] = ShortestPathTree(G, source, weight=self.weight)
+        return tree
+
+    def query(self, G, source, target):
+        """Return the :class:`~netsim.shortest_path.SearchResult` for one query.
+
+        The tree from ``source`` is only grown as far as ``target``. Raises
+        :class:`~netsim.exceptions.NoPathError` if there is no path.
+        """
+        return self.tree(G, source).query(G, target)
@@ -0,0 +1,21 @@
+"""Exceptions raised by the graph engine."""
+
+
+class NetsimError(Exception):
+    """Base class for all engine errors."""
+
+
+class NoPathError(NetsimError):
+    """Raised when the destination cannot be reached from the source."""
+
+
+class CycleError(NetsimError):
+    """Raised when an algorithm that needs a DAG finds a cycle.
+
+    ``cycle`` holds the nodes of one offending cycle in order.
+    """
+
+    def __init__(self, cycle):
+        self.cycle = list(cycle)
+        loop = " → ".join(str(n) for n in self.cycle + self.cycle[:1])
+        super().__init__(f"Graph contains a cycle: {loop}")
@@ -0,0 +1,146 @@
+"""What-if routing with failed links and nodes.
+
+:class:`FailedView` hides failed edges and nodes from any engine algorithm
+without copying the graph. Rerouting around a failure reuses what is
+already known about the intact graph: a path that avoids every failure is
+still optimal and is returned as is, and otherwise the intact graph's
+distances to the target (from :func:`~netsim.shortest_path.distances_to`)
+drive an A* search. Failures only ever make routes longer, so those
+distances stay admissible, and they are exact everywhere the failure does
+not matter, so the search barely strays from the rerouted path.
+:func:`link_failure_sweep` does this for every link of a path in turn.
+"""
+
+import math
+from dataclasses import dataclass
+
+from netsim.adjacency import edge_weight, predecessors, successors
+from netsim.exceptions import NoPathError
+from netsim.shortest_path import SearchResult, astar, distances_to
+
+
+class FailedView:
+    """``G`` with the ``edges`` (``(u, v)`` pairs) and ``nodes`` taken out.
+
+    Offers the read-only graph interface the engine uses (membership,
+    iteration, weighted successors/predecessors, edge lookups), filtering
+    ``G`` on the fly.
+    """
+
+    def __init__(self, G, edges=(), nodes=(), weight="weight"):
+        self.graph = G
+        self.weight = weight
+        self.failed_edges = frozenset(edges)
+        self.failed_nodes = frozenset(nodes)
+        self._succ = successors(G, weight)
+        self._pred = predecessors(G, weight)
+
+    def __contains__(self, node):
+        return node in self.graph and node not in self.failed_nodes
+
+    def __iter__(self):
+        return (node for node in self.graph if node not in self.failed_nodes)
+
+    def nodes(self):
+        return list(self)
+
+    def number_of_nodes(self):
+        return sum(1 for _ in self)
+
+    def weighted_successors(self, u):
+        if u in self.failed_nodes:
+            return []
+        failed_nodes, failed_edges = self.failed_nodes, self.failed_edges
+        return [(v, w) for v, w in self._succ(u) if v not in failed_nodes and (u, v) not in failed_edges]
+
+    def weighted_predecessors(self, v):
+        if v in self.failed_nodes:
+            return []
+        failed_nodes, failed_edges = self.failed_nodes, self.failed_edges
+        return [(u, w) for u, w in self._pred(v) if u not in failed_nodes and (u, v) not in failed_edges]
+
+    def get_edge_data(self, u, v, default=None):
+        if u in self.failed_nodes or v in self.failed_nodes or (u, v) in self.failed_edges:
+            return default
+        return self.graph.get_edge_data(u, v, default)
+
+    def edges(self, data=False):
+        """Iterate the surviving edges like ``nx.DiGraph.edges``.
+
+        ``data=True`` yields ``(u, v, {weight: w})`` and a weight name yields
+        ``(u, v, w)``.
+        """
+        for u in self:
+            for v, w in self.weighted_successors(u):
+                if data is True:
+                    yield u, v, {self.weight: w}
+                elif data:
+                    yield u, v, w
+                else:
+                    yield u, v
+
+    def keeps(self, path):
+        """Return whether ``path`` avoids every failed node and edge."""
+        return self.failed_nodes.isdisjoint(path) and self.failed_edges.isdisjoint(zip(path, path[1:]))
+
+
+def reroute(view, source, target, baseline=None, remaining=None):
+    """Shortest ``source → target`` path in the :class:`FailedView` ``view``.
+
+    ``baseline`` is the intact graph's shortest path, returned unchanged if
+    the failures miss it. ``remaining`` maps nodes to their distance to
+    ``target`` in the intact graph; it is computed if not given, so pass it
+    in when rerouting to the same target repeatedly.
+    """
+    if baseline is not None and view.keeps(baseline.path):
+        return baseline
+    if remaining is None:
+        remaining = distances_to(view.graph, target, view.weight)[0]
+    return astar(view, source, target, lambda node: remaining.get(node, math.inf), weight=view.weight)
+
+
+@dataclass
+class LinkFailure:
+    """Impact of failing one link: ``result`` is ``None`` if it disconnects the target."""
+
+    edge: tuple
+    base_cost: float
+    result: SearchResult = None
+
+    @property
+    def delta(self):
+        return None if self.result is None else self.result.cost - self.base_cost
+
+    def as_row(self):
+        return {
+            "failed link": f"{self.edge[0]} → {self.edge[1]}",
+            "cost": None if self.result is None else self.result.cost,
+            "delta": self.delta,
+            "explored": None if self.result is None else len(self.result.explored),
+            "rerouted path": "disconnected" if self.result is None else " → ".join(map(str, self.result.path)),
+        }
+
+
+def link_failure_sweep(G, source, target, path=None, remaining=None, weight="weight"):
+    """Fail each link of ``path`` on its own and reroute; returns one :class:`LinkFailure` per link.
+
+    ``G`` may itself be a :class:`FailedView` (a sweep on top of other
+    failures). ``path`` defaults to the shortest path; ``remaining`` is as
+    for :func:`reroute` and is computed once for the whole sweep.
+    """
+    if not isinstance(G, FailedView):
+        G = FailedView(G, weight=weight)
+    if remaining is None:
+        remaining = distances_to(G.graph, target, weight)[0]
+    if path is None:
+        path = reroute(G, source, target, remaining=remaining).path
+    base_cost = sum(edge_weight(G.graph, u, v, weight) for u, v in zip(path, path[1:]))
+    impacts = []
+    for edge in zip(path, path[1:]):
+        view = FailedView(G.graph, G.failed_edges | {edge}, G.failed_nodes, weight=weight)
+        try:
+            result = reroute(view, source, target, remaining=remaining)
+        except NoPathError:
+            result = None
+        impacts.append(LinkFailure(edge, base_cost, result))
+    return impacts
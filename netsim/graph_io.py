@@ -0,0 +1,434 @@
+"""Streaming readers for edge lists, CSV, GraphML and JSON graph files.
+
+Every reader takes a binary file object and yields ``(source, target,
+weight)`` tuples as it goes, so memory use is bounded by the chunk size rather
+than by the file size. Node names are always returned as strings.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+from contextlib import contextmanager
+from itertools import chain, islice
+from xml.etree.ElementTree import iterparse
+
+DEFAULT_WEIGHT = 1.0
+DEFAULT_CHUNK_SIZE = 50_000
+
+FORMATS = {
+    "csv": "CSV edge list",
+    "edgelist": "Whitespace edge list",
+    "graphml": "GraphML",
+    "json": "JSON (node-link or edge array)",
+    "jsonl": "JSON Lines",
+}
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".txt": "edgelist",
+    ".edges": "edgelist",
+    ".edgelist": "edgelist",
+    ".graphml": "graphml",
+    ".xml": "graphml",
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+_SOURCE_COLUMNS = ("source", "src", "from", "u", "start")
+_TARGET_COLUMNS = ("target", "dst", "to", "v", "end", "destination")
+_WEIGHT_COLUMNS = ("weight", "cost", "time", "w", "duration", "latency")
+_RATE_COLUMNS = ("rate", "packets", "pps", "load", "demand")
+_NODE_COLUMNS = ("node", "id", "name", "label")
+_LAT_COLUMNS = ("lat", "latitude")
+_LON_COLUMNS = ("lon", "lng", "long", "longitude")
+
+
+def detect_format(filename):
+    """Guess the format of ``filename`` from its extension (``None`` if unknown)."""
+    return _EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def _weight(value, where):
+    if value is None or value == "":
+        return DEFAULT_WEIGHT
+    try:
+        weight = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: weight {value!r} is not a number") from None
+    if not math.isfinite(weight):
+        raise ValueError(f"{where}: weight {value!r} is not a finite number")
+    if weight < 0:
+        raise ValueError(f"{where}: negative weight {weight} is not supported")
+    return weight
+
+
+@contextmanager
+def _text(stream):
+    # Decode without taking ownership: the caller's stream stays open.
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+    try:
+        yield text
+    finally:
+        text.detach()
+
+
+def _pick(header, names):
+    for i, column in enumerate(header):
+        if column in names:
+            return i
+    return None
+
+
+def _iter_csv(stream):
+    with _text(stream) as lines:
+        yield from _parse_csv(lines)
+
+
+def _parse_csv(lines):
+    first = next(lines, "")
+    # Pick the delimiter from the first line instead of sniffing a sample.
+    delimiter = max(",;\t|", key=first.count)
+    cols = (0, 1, 2)
+    rows = csv.reader(chain([first], lines), delimiter=delimiter)
+    for lineno, row in enumerate(rows, 1):
+        if not row or row[0].startswith("#"):
+            continue
+        if lineno == 1:
+            header = [c.strip().lower() for c in row]
+            src, tgt = _pick(header, _SOURCE_COLUMNS), _pick(header, _TARGET_COLUMNS)
+            if src is not None and tgt is not None:
+                cols = (src, tgt, _pick(header, _WEIGHT_COLUMNS))
+                continue
+        src, tgt, wgt = cols
+        if len(row) <= max(src, tgt):
+            raise ValueError(f"line {lineno}: expected source and target columns")
+        value = row[wgt].strip() if wgt is not None and wgt < len(row) else None
+        u, v = row[src].strip(), row[tgt].strip()
+        if not u or not v:
+            raise ValueError(f"line {lineno}: empty node name")
+        yield u, v, _weight(value, f"line {lineno}")
+
+
+def _iter_edgelist(stream):
+    with _text(stream) as lines:
+        for lineno, line in enumerate(lines, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                raise ValueError(f"line {lineno}: expected 'source target [weight]'")
+            value = parts[2] if len(parts) > 2 else None
+            yield parts[0], parts[1], _weight(value, f"line {lineno}")
+
+
+def iter_node_coordinates(stream):
+    """Yield ``(node, lat, lon)`` from a CSV whose header names those columns."""
+    with _text(stream) as lines:
+        first = next(lines, "")
+        delimiter = max(",;\t|", key=first.count)
+        rows = csv.reader(chain([first], lines), delimiter=delimiter)
+        header = [c.strip().lower() for c in next(rows, [])]
+        cols = (_pick(header, _NODE_COLUMNS), _pick(header, _LAT_COLUMNS), _pick(header, _LON_COLUMNS))
+        if None in cols:
+            raise ValueError("header must name a node, a latitude and a longitude column")
+        for lineno, row in enumerate(rows, 2):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                node, lat, lon = (row[i].strip() for i in cols)
+                yield node, float(lat), float(lon)
+            except (IndexError, ValueError):
+                raise ValueError(f"line {lineno}: expected a node name and numeric lat/lon") from None
+
+
+def iter_pairs(stream):
+    """Yield ``(source, target)`` query pairs from a CSV or whitespace-separated file.
+
+    The first line may be a header naming the source and target columns;
+    otherwise the first two columns are used and any others are ignored.
+    """
+    with _text(stream) as lines:
+        first = next(lines, "")
+        delimiter = max(",;\t|", key=first.count)
+        if first.count(delimiter) == 0:
+            rows = (line.split() for line in chain([first], lines))
+        else:
+            rows = csv.reader(chain([first], lines), delimiter=delimiter)
+        cols = (0, 1)
+        for lineno, row in enumerate(rows, 1):
+            if not row or row[0].startswith("#"):
+                continue
+            if lineno == 1:
+                header = [c.strip().lower() for c in row]
+                src, tgt = _pick(header, _SOURCE_COLUMNS), _pick(header, _TARGET_COLUMNS)
+                if src is not None and tgt is not None:
+                    cols = (src, tgt)
+                    continue
+            if len(row) <= max(cols):
+                raise ValueError(f"line {lineno}: expected a source and a target")
+            yield row[cols[0]].strip(), row[cols[1]].strip()
+
+
+def iter_flows(stream):
+    """Yield ``(source, target, rate)`` traffic flows from a CSV or whitespace-separated file.
+
+    The first line may be a header naming the source, target and rate
+    columns; one that has further columns but no known rate column is an
+    error, so rates are never silently replaced by the default. Otherwise
+    the first three columns are used, and a missing rate is
+    ``DEFAULT_WEIGHT`` (one packet per time unit).
+    """
+    with _text(stream) as lines:
+        first = next(lines, "")
+        delimiter = max(",;\t|", key=first.count)
+        if first.count(delimiter) == 0:
+            rows = (line.split() for line in chain([first], lines))
+        else:
+            rows = csv.reader(chain([first], lines), delimiter=delimiter)
+        cols = (0, 1, 2)
+        for lineno, row in enumerate(rows, 1):
+            if not row or row[0].startswith("#"):
+                continue
+            if lineno == 1:
+                header = [c.strip().lower() for c in row]
+                src, tgt = _pick(header, _SOURCE_COLUMNS), _pick(header, _TARGET_COLUMNS)
+                if src is not None and tgt is not None:
+                    rate = _pick(header, _RATE_COLUMNS)
+                    if rate is None and len(header) > 2:
+                        raise ValueError(f"line 1: no rate column; name it one of {', '.join(_RATE_COLUMNS)}")
+                    cols = (src, tgt, rate)
+                    continue
+            src, tgt, rate = cols
+            if len(row) <= max(src, tgt):
+                raise ValueError(f"line {lineno}: expected a source and a target")
+            value = row[rate].strip() if rate is not None and rate < len(row) else ""
+            try:
+                flow_rate = float(value) if value else DEFAULT_WEIGHT
+            except ValueError:
+                raise ValueError(f"line {lineno}: rate {value!r} is not a number") from None
+            if not math.isfinite(flow_rate):
+                raise ValueError(f"line {lineno}: rate {value!r} is not a finite number")
+            if flow_rate < 0:
+                raise ValueError(f"line {lineno}: negative rate {flow_rate} is not supported")
+            yield row[src].strip(), row[tgt].strip(), flow_rate
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _iter_graphml(stream):
+    weight_keys = set()
+    undirected = False
+    graph = None
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = _local(elem.tag)
+        if event == "start":
+            if tag == "graph":
+                graph = elem
+                undirected = elem.get("edgedefault") == "undirected"
+            continue
+        if tag == "key":
+            if elem.get("for") in ("edge", "all") and elem.get("attr.name", "").lower() in _WEIGHT_COLUMNS:
+                weight_keys.add(elem.get("id"))
+            continue
+        if graph is None:
+            continue
+        if tag == "edge":
+            value = None
+            for data in elem:
+                if _local(data.tag) == "data" and data.get("key") in weight_keys:
+                    value = (data.text or "").strip()
+            u, v = elem.get("source"), elem.get("target")
+            if not u or not v:
+                raise ValueError(f"edge {u}->{v}: edge needs a source and a target")
+            w = _weight(value, f"edge {u}->{v}")
+            yield u, v, w
+            if undirected or elem.get("directed") == "false":
+                yield v, u, w
+        elif tag != "node":
+            continue
+        # Drop parsed elements so the tree never holds more than one edge.
+        graph.clear()
+
+
+def _json_edge(item, where):
+    if isinstance(item, dict):
+        u = item.get("source", item.get("from"))
+        v = item.get("target", item.get("to"))
+        value = next((item[k] for k in _WEIGHT_COLUMNS if k in item), None)
+    elif isinstance(item, (list, tuple)) and len(item) >= 2:
+        u, v = item[0], item[1]
+        value = item[2] if len(item) > 2 else None
+    else:
+        raise ValueError(f"{where}: cannot read an edge from {item!r}")
+    if u is None or v is None:
+        raise ValueError(f"{where}: edge needs a source and a target")
+    u, v = str(u), str(v)
+    if not u or not v:
+        raise ValueError(f"{where}: empty node name")
+    return u, v, _weight(value, where)
+
+
+class _JsonStream:
+    """Just enough of an incremental JSON reader to walk one level of nesting."""
+
+    def __init__(self, text, block=1 << 16):
+        self.text = text
+        self.block = block
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        data = self.text.read(self.block)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"malformed JSON: expected {char!r} near offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending exactly at the buffer edge may continue in the next block.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _iter_json(stream):
+    with _text(stream) as text:
+        yield from _parse_json(_JsonStream(text))
+
+
+def _parse_json(reader):
+    first = reader.peek()
+    if first == "[":
+        for i, item in enumerate(reader.items(), 1):
+            yield _json_edge(item, f"edge {i}")
+        return
+    reader.expect("{")
+    undirected = False
+    edges_read = False
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key in ("links", "edges") and reader.peek() == "[":
+            for i, item in enumerate(reader.items(), 1):
+                u, v, w = _json_edge(item, f"{key}[{i}]")
+                edges_read = True
+                yield u, v, w
+                if undirected:
+                    yield v, u, w
+        elif key == "directed":
+            undirected = reader.value() is False
+            if undirected and edges_read:
+                # The edges went out one-way already; reading on would drop half the links
+                raise ValueError('"directed": false must come before the "links"/"edges" array')
+        else:
+            reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+        elif reader.peek() != "}":
+            raise ValueError(f"malformed JSON: expected ',' or '}}' near offset {reader.pos}")
+
+
+def _iter_jsonl(stream):
+    with _text(stream) as lines:
+        for lineno, line in enumerate(lines, 1):
+            if line.strip():
+                yield _json_edge(json.loads(line), f"line {lineno}")
+
+
+_READERS = {
+    "csv": _iter_csv,
+    "edgelist": _iter_edgelist,
+    "graphml": _iter_graphml,
+    "json": _iter_json,
+    "jsonl": _iter_jsonl,
+}
+
+
+def iter_edges(stream, fmt):
+    """Yield ``(source, target, weight)`` from binary ``stream`` in format ``fmt``."""
+    try:
+        reader = _READERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown graph format {fmt!r}") from None
+    for u, v, w in reader(stream):
+        yield str(u), str(v), w
+
+
+def iter_edge_chunks(stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Like :func:`iter_edges` but yields lists of at most ``chunk_size`` edges."""
+    edges = iter_edges(stream, fmt)
+    while True:
+        chunk = list(islice(edges, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_graph(source, fmt=None, graph=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Load a graph file into ``graph`` (a new :class:`~netsim.compact_graph.CompactGraph` by default).
+
+    ``source`` is a path or a binary file object. ``fmt`` defaults to the
+    format detected from the file name. Returns the graph.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            return read_graph(stream, fmt or detect_format(os.fspath(source)), graph, chunk_size)
+    fmt = fmt or detect_format(getattr(source, "name", ""))
+    if fmt is None:
+        raise ValueError("Could not detect the graph format; pass it explicitly")
+    if graph is None:
+        from netsim.compact_graph import CompactGraph
+
+        graph = CompactGraph()
+    for chunk in iter_edge_chunks(source, fmt, chunk_size):
+        graph.add_weighted_edges_from(chunk)
+    return graph
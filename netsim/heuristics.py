@@ -0,0 +1,58 @@
+"""Distance-to-target heuristics for A* built from node coordinates.
+
+Coordinates (layout x/y or geographic lat/lon) and edge weights live in
+different units, so the straight-line distance is multiplied by the smallest
+``weight / distance`` ratio over all edges. With that scale the heuristic
+never overestimates and is consistent, which keeps A* exact.
+"""
+
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def euclidean(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def haversine(a, b):
+    """Great-circle distance in km between two ``(lat, lon)`` pairs in degrees."""
+    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+METRICS = {"euclidean": euclidean, "haversine": haversine}
+
+
+def coordinate_scale(G, coords, metric=euclidean, weight="weight"):
+    """Return the largest factor that keeps ``metric`` distances below edge weights.
+
+    Returns ``0.0`` (no guidance, A* degrades to Dijkstra) when any node has
+    no coordinates, since the bound cannot be guaranteed across such nodes.
+    """
+    if any(node not in coords for node in G):
+        return 0.0
+    scale = math.inf
+    for u, v, w in G.edges(data=weight):
+        span = metric(coords[u], coords[v])
+        if span > 0:
+            scale = min(scale, (1 if w is None else w) / span)
+    return 0.0 if scale == math.inf else scale
+
+
+def make_heuristic(coords, target, scale, metric=euclidean):
+    """Return ``h(node)``: the scaled straight-line distance from ``node`` to ``target``."""
+    if scale <= 0 or target not in coords:
+        return lambda node: 0.0
+    goal = coords[target]
+    cache = {}
+
+    def heuristic(node):
+        h = cache.get(node)
+        if h is None:
+            h = cache[node] = scale * metric(coords[node], goal)
+        return h
+
+    return heuristic
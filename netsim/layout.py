@@ -0,0 +1,153 @@
+"""Deterministic node layouts computed with NumPy.
+
+:func:`compute_layout` places a whole graph: a spectral embedding (found by
+power iteration over the edge arrays, so it costs O(E) per step and works for
+any size) refined with a vectorized force-directed pass on graphs small
+enough for all-pairs repulsion. :func:`extend_layout` places nodes added
+later next to their already placed neighbours, leaving existing positions
+alone. The same graph always gets the same layout, so the browser can draw
+it with physics off.
+"""
+
+import math
+import zlib
+
+import numpy as np
+
+from netsim.adjacency import predecessors, successors
+
+# All-pairs repulsion is O(V^2) per step; above this only the spectral
+# embedding is used.
+FORCE_LIMIT = 1500
+
+
+def _edge_arrays(G):
+    """Return ``(names, sources, targets)`` with edges as integer id arrays."""
+    if hasattr(G, "csr"):
+        offsets, targets, _ = G.csr()
+        names = G.nodes()
+        sources = np.repeat(np.arange(len(names), dtype=np.int64), np.diff(offsets))
+        return names, sources, targets.astype(np.int64)
+    names = list(G.nodes())
+    index = {node: i for i, node in enumerate(names)}
+    pairs = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+    return names, pairs[:, 0], pairs[:, 1]
+
+
+def _canvas_extent(n):
+    """Half-width/height of the drawing area; grows with the node count."""
+    width = 300 * max(1.0, math.sqrt(n / 20))
+    return width, width * 2 / 3
+
+
+def spectral_layout(n, sources, targets, iterations=100, seed=0):
+    """Return an ``(n, 2)`` spectral embedding of the undirected graph.
+
+    Power iteration on ``(I + D^-1 A) / 2`` with the iterates kept
+    degree-orthogonal to the constant vector and to each other (Koren's
+    method) converges to the smoothest non-trivial eigenvectors, which place
+    tightly connected nodes close together.
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1, 1, size=(n, 2))
+    if n < 3 or len(sources) == 0:
+        return pos
+    src = np.concatenate([sources, targets])
+    dst = np.concatenate([targets, sources])
+    degree = np.bincount(src, minlength=n).astype(float)
+    # Isolated nodes keep their random start
+    connected = degree > 0
+    degree[~connected] = 1.0
+    for _ in range(iterations):
+        spread = np.empty_like(pos)
+        for axis in range(2):
+            spread[:, axis] = np.bincount(src, weights=pos[dst, axis], minlength=n)
+        pos = np.where(connected[:, None], 0.5 * (pos + spread / degree[:, None]), pos)
+        # D-orthogonalize against the constant vector, then the axes against each other
+        pos -= (degree @ pos) / degree.sum()
+        x, y = pos[:, 0], pos[:, 1]
+        y -= (degree * x * y).sum() / max((degree * x * x).sum(), 1e-12) * x
+        pos /= np.maximum(np.abs(pos).max(axis=0), 1e-12)
+    return pos
+
+
+def force_layout(pos, sources, targets, iterations=50):
+    """Refine ``pos`` (``(n, 2)``, in place) with Fruchterman–Reingold forces."""
+    n = len(pos)
+    if n < 2:
+        return pos
+    k = math.sqrt(4.0 / n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        delta = pos[:, None, :] - pos[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=-1), 1e-3)
+        displacement = (delta * (k * k / distance ** 2)[:, :, None]).sum(axis=1)
+        # Edges pull their endpoints together
+        pull = pos[sources] - pos[targets]
+        length = np.maximum(np.linalg.norm(pull, axis=-1), 1e-3)
+        force = pull * (length / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(sources, weights=force[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(targets, weights=force[:, axis], minlength=n)
+        # Mild gravity keeps separate components from drifting apart
+        displacement -= 0.05 * pos
+        step = np.maximum(np.linalg.norm(displacement, axis=-1), 1e-9)
+        pos += displacement / step[:, None] * np.minimum(step, temperature)[:, None]
+        temperature -= cooling
+    return pos
+
+
+def compute_layout(G, seed=0):
+    """Return ``{node: {"x": x, "y": y}}`` for every node of ``G``."""
+    names, sources, targets = _edge_arrays(G)
+    n = len(names)
+    if n == 0:
+        return {}
+    pos = spectral_layout(n, sources, targets, seed=seed)
+    # Separate components collapse to one point each; spread them a little
+    pos += np.random.default_rng(seed).normal(scale=0.02, size=pos.shape)
+    if n <= FORCE_LIMIT:
+        pos = force_layout(pos, sources, targets)
+    # Fit into the canvas, centred on the origin
+    pos -= (pos.max(axis=0) + pos.min(axis=0)) / 2
+    pos /= np.maximum(np.abs(pos).max(axis=0), 1e-12)
+    pos *= _canvas_extent(n)
+    return {node: {"x": float(x), "y": float(y)} for node, (x, y) in zip(names, pos.tolist())}
+
+
+def _jitter(node, radius):
+    """A fixed offset of up to ``radius`` derived from the node's name."""
+    seed = zlib.crc32(repr(node).encode())
+    angle = (seed % 3600) / 3600 * 2 * math.pi
+    distance = radius * (0.5 + (seed // 3600 % 1000) / 2000)
+    return distance * math.cos(angle), distance * math.sin(angle)
+
+
+def extend_layout(G, positions, spacing=80.0):
+    """Add positions for the nodes of ``G`` missing from ``positions`` (in place).
+
+    With no positions at all the whole graph is laid out with
+    :func:`compute_layout`. Otherwise each new node goes next to the mean of
+    its placed neighbours, or somewhere in the drawing area if it has none.
+    Returns the list of nodes that were placed.
+    """
+    if not positions:
+        positions.update(compute_layout(G))
+        return list(positions)
+    if len(positions) >= G.number_of_nodes():
+        return []
+    missing = [node for node in G if node not in positions]
+    width, height = _canvas_extent(G.number_of_nodes())
+    succ, pred = successors(G), predecessors(G)
+    for node in missing:
+        placed = [positions[v] for v, _ in succ(node) + pred(node) if v in positions]
+        dx, dy = _jitter(node, spacing)
+        if placed:
+            x = sum(p["x"] for p in placed) / len(placed) + dx
+            y = sum(p["y"] for p in placed) / len(placed) + dy
+        else:
+            x = dx / spacing * width
+            y = dy / spacing * height
+        positions[node] = {"x": x, "y": y}
+    return missing
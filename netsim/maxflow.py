@@ -0,0 +1,261 @@
+"""Maximum flow and minimum cut, with edge weights read as capacities.
+
+:class:`FlowNetwork` keeps the residual graph as flat lists (arc ``e``'s
+reverse is ``e ^ 1``) and runs Dinic's algorithm on it: a BFS layers the
+residual graph, then an iterative DFS with per-node arc pointers saturates
+the layers, so no arc is scanned twice per phase.
+
+The residual state is kept between queries for the same source and target.
+:meth:`FlowNetwork.set_capacity` changes one link in place. Raising a
+capacity (or adding a link) leaves the current flow feasible, so the next
+query only looks for the extra augmenting paths. Lowering it below the
+flow it carries first reroutes the excess around the link and cancels what
+cannot be rerouted, again without starting over.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+
+from netsim.adjacency import successors
+from netsim.exceptions import NoPathError
+
+# Flow below this is rounding noise when splitting the flow into routes
+EPSILON = 1e-9
+
+
+@dataclass
+class MaxFlowResult:
+    """A maximum flow and the minimum cut that limits it.
+
+    ``cut`` lists the ``(u, v, capacity)`` links from ``source_side`` (the
+    nodes the source can still reach in the residual graph, in BFS order) to
+    the rest; their capacities add up to ``value``. ``paths`` decomposes the
+    flow into ``(path, amount)`` routes, largest first.
+    """
+
+    value: float
+    cut: list
+    source_side: list
+    paths: list = field(default_factory=list)
+    phases: int = 0
+
+
+class FlowNetwork:
+    """Residual graph of ``G`` for repeated max-flow queries."""
+
+    def __init__(self, G, weight="weight"):
+        self.names = list(G.nodes())
+        self.ids = {node: i for i, node in enumerate(self.names)}
+        self.adj = [[] for _ in self.names]
+        self.head = []
+        self.cap = []
+        # Capacity of every forward (even) arc; reverse arcs have none
+        self.capacity = []
+        self.arc = {}
+        self.solved = None
+        self.value = 0
+        self.phases = 0
+        succ = successors(G, weight)
+        for u in self.names:
+            for v, w in succ(u):
+                if u != v:
+                    self._add_arc(self.ids[u], self.ids[v], w)
+
+    def _add_arc(self, i, j, capacity):
+        e = len(self.head)
+        self.arc[i, j] = e
+        self.adj[i].append(e)
+        self.adj[j].append(e + 1)
+        self.head += (j, i)
+        self.cap += (capacity, 0)
+        self.capacity += (capacity, 0)
+
+    def _node(self, node):
+        i = self.ids.get(node)
+        if i is None:
+            i = self.ids[node] = len(self.names)
+            self.names.append(node)
+            self.adj.append([])
+        return i
+
+    def flow_on(self, u, v):
+        """Flow currently on link ``u → v`` (0 if there is no such link)."""
+        e = self.arc.get((self.ids.get(u), self.ids.get(v)))
+        return 0 if e is None else self.capacity[e] - self.cap[e]
+
+    def reset(self):
+        """Drop the current flow."""
+        self.cap = list(self.capacity)
+        self.solved = None
+        self.value = 0
+
+    def set_capacity(self, u, v, capacity):
+        """Set link ``u → v``'s capacity (adding the link if needed), keeping the flow valid."""
+        i, j = self._node(u), self._node(v)
+        if i == j:
+            return
+        e = self.arc.get((i, j))
+        if e is None:
+            self._add_arc(i, j, capacity)
+            return
+        flow = self.capacity[e] - self.cap[e]
+        self.capacity[e] = capacity
+        if capacity >= flow:
+            self.cap[e] = capacity - flow
+            return
+        # Take the excess off the link, leaving i with too much inflow and j
+        # with too little; reroute i → j where possible, and hand back the
+        # rest along the routes it came (i → source) and went (target → j)
+        excess = flow - capacity
+        self.cap[e] = 0
+        self.cap[e ^ 1] = capacity
+        rerouted = self._push(i, j, excess)
+        cancelled = excess - rerouted
+        if cancelled > 0 and self.solved is not None:
+            s, t = self.solved
+            if (i != s and self._push(i, s, cancelled) < cancelled) or (j != t and self._push(t, j, cancelled) < cancelled):
+                self.reset()
+                return
+            self.value -= cancelled
+        elif cancelled > 0:
+            self.reset()
+
+    def _levels(self, s, t):
+        level = [-1] * len(self.adj)
+        level[s] = 0
+        queue = deque([s])
+        adj, head, cap = self.adj, self.head, self.cap
+        while queue:
+            u = queue.popleft()
+            for e in adj[u]:
+                v = head[e]
+                if cap[e] > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level if level[t] >= 0 else None
+
+    def _push(self, s, t, limit=float("inf")):
+        """Push up to ``limit`` more units from ``s`` to ``t``; returns how much went through."""
+        adj, head, cap = self.adj, self.head, self.cap
+        total = 0
+        self.phases = 0
+        while total < limit:
+            level = self._levels(s, t)
+            if level is None:
+                break
+            self.phases += 1
+            pointer = [0] * len(adj)
+            while total < limit:
+                # Walk down the layers along the first usable arc of each node
+                arcs = []
+                u = s
+                while u != t:
+                    edges = adj[u]
+                    i = pointer[u]
+                    while i < len(edges):
+                        e = edges[i]
+                        if cap[e] > 0 and level[head[e]] == level[u] + 1:
+                            break
+                        i += 1
+                    pointer[u] = i
+                    if i < len(edges):
+                        arcs.append(edges[i])
+                        u = head[edges[i]]
+                    elif arcs:
+                        # Dead end: never come back here this phase
+                        level[u] = -1
+                        u = head[arcs.pop() ^ 1]
+                    else:
+                        break
+                if u != t:
+                    break
+                amount = min(limit - total, min(cap[e] for e in arcs))
+                for e in arcs:
+                    cap[e] -= amount
+                    cap[e ^ 1] += amount
+                total += amount
+        return total
+
+    def max_flow(self, source, target, path_limit=20):
+        """Return the :class:`MaxFlowResult` from ``source`` to ``target``.
+
+        Continues from the previous flow when the endpoints are the same.
+        Raises :class:`NoPathError` if either endpoint is missing or they
+        are the same node.
+        """
+        s, t = self.ids.get(source), self.ids.get(target)
+        if s is None or t is None or s == t:
+            raise NoPathError(f"No flow can be sent between {source!r} and {target!r}")
+        if self.solved != (s, t):
+            self.reset()
+            self.solved = (s, t)
+        self.value += self._push(s, t)
+
+        # Minimum cut: what the source still reaches in the residual graph
+        seen = [False] * len(self.adj)
+        seen[s] = True
+        order = [s]
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for e in self.adj[u]:
+                v = self.head[e]
+                if self.cap[e] > 0 and not seen[v]:
+                    seen[v] = True
+                    order.append(v)
+                    queue.append(v)
+        names = self.names
+        cut = [
+            (names[i], names[j], self.capacity[e])
+            for (i, j), e in self.arc.items() if seen[i] and not seen[j] and self.capacity[e] > 0
+        ]
+        return MaxFlowResult(self.value, cut, [names[i] for i in order], self._paths(s, t, path_limit), self.phases)
+
+    def _paths(self, s, t, limit):
+        """Split the flow into at most ``limit`` source-to-target routes, largest first."""
+        left = {e: self.capacity[e] - self.cap[e] for e in range(0, len(self.head), 2) if self.capacity[e] - self.cap[e] > EPSILON}
+        out = {}
+        for e in left:
+            out.setdefault(self.head[e ^ 1], []).append(e)
+        paths = []
+        while len(paths) < limit:
+            arcs = []
+            position = {s: 0}
+            u = s
+            while u != t:
+                edges = out.get(u)
+                while edges and left[edges[-1]] <= EPSILON:
+                    edges.pop()
+                if not edges:
+                    if not arcs:
+                        break
+                    # Only rounding noise led here; drop it and retry
+                    left[arcs[-1]] = 0
+                    arcs = []
+                    position = {s: 0}
+                    u = s
+                    continue
+                e = edges[-1]
+                v = self.head[e]
+                if v in position:
+                    # A flow cycle: cancel it and carry on from where it started
+                    cycle = arcs[position[v]:] + [e]
+                    amount = min(left[a] for a in cycle)
+                    for a in cycle:
+                        left[a] -= amount
+                    for a in arcs[position[v]:]:
+                        del position[self.head[a]]
+                    del arcs[position[v]:]
+                    u = v
+                    continue
+                arcs.append(e)
+                position[v] = len(arcs)
+                u = v
+            if u != t:
+                break
+            amount = min(left[e] for e in arcs)
+            for e in arcs:
+                left[e] -= amount
+            paths.append(([self.names[s]] + [self.names[self.head[e]] for e in arcs], amount))
+        paths.sort(key=lambda route: -route[1])
+        return paths
@@ -0,0 +1,121 @@
+"""Per-rerun stage timings with a rolling history.
+
+A :class:`StageTimer` splits one rerun into consecutive stages by lap
+times, so instrumenting code is a single ``timer.lap("name")`` call after
+each stage. Finished timers go into a :class:`ProfileHistory`, which keeps
+the last ``limit`` runs, summarizes them per stage and exports them as JSON
+or in the Prometheus text format.
+"""
+
+import json
+import math
+import time
+from collections import deque
+
+QUANTILES = (0.5, 0.95)
+
+
+class StageTimer:
+    """Lap timer for the stages of one rerun.
+
+    Each :meth:`lap` records the time since the previous lap (or since the
+    timer was created) under the given stage name; laps with the same name
+    add up. :meth:`note` stores a size or count alongside the timings.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.sizes = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def note(self, name, value):
+        self.sizes[name] = value
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+
+def _quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class ProfileHistory:
+    """The last ``limit`` profiled runs, oldest first."""
+
+    def __init__(self, limit=100):
+        self.runs = deque(maxlen=limit)
+
+    def __len__(self):
+        return len(self.runs)
+
+    def add(self, timer, tag=None):
+        """Store a finished ``timer``; ``tag`` identifies the run for :meth:`attach`."""
+        self.runs.append({
+            "at": timer.started,
+            "tag": tag,
+            "stages": dict(timer.stages, total=timer.total),
+            "sizes": dict(timer.sizes),
+        })
+
+    def attach(self, tag, stage, seconds):
+        """Add a stage measured later (e.g. by the browser) to the newest run tagged ``tag``.
+
+        Returns ``False`` if no such run is still in the history.
+        """
+        for run in reversed(self.runs):
+            if run["tag"] == tag:
+                run["stages"][stage] = seconds
+                return True
+        return False
+
+    def clear(self):
+        self.runs.clear()
+
+    def _samples(self):
+        samples = {}
+        for run in self.runs:
+            for stage, seconds in run["stages"].items():
+                samples.setdefault(stage, []).append(seconds)
+        return samples
+
+    def summary(self):
+        """Return ``{stage: {"count", "last", "mean", "p50", "p95", "max"}}`` in seconds."""
+        return {
+            stage: {
+                "count": len(values),
+                "last": values[-1],
+                "mean": sum(values) / len(values),
+                **{f"p{round(q * 100)}": _quantile(values, q) for q in QUANTILES},
+                "max": max(values),
+            }
+            for stage, values in self._samples().items()
+        }
+
+    def to_json(self):
+        return json.dumps({"runs": list(self.runs), "summary": self.summary()}, indent=2, default=str)
+
+    def to_prometheus(self, prefix="netsim"):
+        """Stage timings as a Prometheus summary, plus the latest sizes as gauges."""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each stage of a rerun.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, values in self._samples().items():
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {_quantile(values, q):.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {sum(values):.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {len(values)}')
+        if self.runs:
+            lines.append(f"# HELP {prefix}_last_size Sizes recorded by the latest rerun.")
+            lines.append(f"# TYPE {prefix}_last_size gauge")
+            for name, value in self.runs[-1]["sizes"].items():
+                lines.append(f'{prefix}_last_size{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
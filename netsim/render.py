@@ -0,0 +1,204 @@
+"""Level-of-detail decisions and summarized payloads for the network view.
+
+Small graphs are drawn in full with every effect. Past ``lite_nodes`` the
+view drops shadows, edge labels and curved edges. Past ``overview_nodes`` (or
+``overview_edges``) only the current path and its neighbourhood are sent in
+detail; every other node is folded into a grid cell of the layout, and edges
+between cells are merged, so the browser gets a few hundred elements no
+matter how large the graph is.
+
+:class:`ChangeLog` keeps the connections added since the browser's last full
+snapshot, so a rerun only has to send those.
+"""
+
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+
+from netsim.adjacency import predecessors, successors
+
+MODES = ("full", "lite", "overview")
+
+# Drawing switches the vis.js template reads for each mode.
+STYLES = {
+    "full": {"shadows": True, "edgeLabels": True, "smooth": True, "hideEdgesOnDrag": False},
+    "lite": {"shadows": False, "edgeLabels": False, "smooth": False, "hideEdgesOnDrag": True},
+    "overview": {"shadows": False, "edgeLabels": False, "smooth": False, "hideEdgesOnDrag": True},
+}
+
+CLUSTER_PREFIX = "cluster:"
+
+
+@dataclass
+class RenderSettings:
+    """Size thresholds for the view's level of detail."""
+
+    lite_nodes: int = 300
+    overview_nodes: int = 3000
+    overview_edges: int = 15000
+    neighborhood_hops: int = 1
+    max_detail_nodes: int = 1500
+    grid_size: int = 16
+    max_cluster_edges: int = 2000
+
+
+def choose_mode(G, settings):
+    """Return the level of detail ``G`` should be drawn at."""
+    nodes, edges = G.number_of_nodes(), G.number_of_edges()
+    if nodes > settings.overview_nodes or edges > settings.overview_edges:
+        return "overview"
+    if nodes > settings.lite_nodes:
+        return "lite"
+    return "full"
+
+
+def path_neighborhood(G, seeds, hops=1, limit=None):
+    """Return ``seeds`` plus everything within ``hops`` edges of them (either direction).
+
+    Growth stops once ``limit`` nodes are collected; the seeds are always kept.
+    """
+    succ, pred = successors(G), predecessors(G)
+    keep = dict.fromkeys(n for n in seeds if n in G)
+    ring = list(keep)
+    for _ in range(hops):
+        nxt = []
+        for u in ring:
+            for v, _ in succ(u) + pred(u):
+                if v not in keep:
+                    if limit is not None and len(keep) >= limit:
+                        return set(keep)
+                    keep[v] = None
+                    nxt.append(v)
+        ring = nxt
+    return set(keep)
+
+
+def detail_payload(G, positions):
+    """Every node and edge of ``G`` in the shape the vis.js template expects."""
+    nodes_data = [
+        {"id": node, "label": node, "x": positions[node]["x"], "y": positions[node]["y"]}
+        for node in G.nodes()
+    ]
+    edges_data = [{"from": u, "to": v, "weight": w} for u, v, w in G.edges(data="weight")]
+    return nodes_data, edges_data
+
+
+def overview_payload(G, positions, focus=(), settings=None):
+    """Summarize ``G`` as layout-grid clusters around a fully detailed ``focus``.
+
+    Returns ``(nodes_data, edges_data)`` in the shape the vis.js template
+    expects. Cluster nodes carry ``isCluster`` and ``count``; merged edges
+    carry ``count`` and the cheapest ``weight`` among the edges they stand for.
+    Only the ``max_cluster_edges`` busiest merged edges are kept.
+    """
+    settings = settings or RenderSettings()
+    focus = set(focus)
+    xs = [p["x"] for p in positions.values()] or [0.0]
+    ys = [p["y"] for p in positions.values()] or [0.0]
+    min_x, min_y = min(xs), min(ys)
+    span_x = (max(xs) - min_x) or 1.0
+    span_y = (max(ys) - min_y) or 1.0
+    cells = settings.grid_size
+
+    owner = {}
+    members = {}
+    for node in G:
+        if node in focus:
+            owner[node] = node
+            continue
+        pos = positions.get(node, {"x": min_x, "y": min_y})
+        i = min(int((pos["x"] - min_x) / span_x * cells), cells - 1)
+        j = min(int((pos["y"] - min_y) / span_y * cells), cells - 1)
+        cluster = f"{CLUSTER_PREFIX}{i}:{j}"
+        owner[node] = cluster
+        cell = members.get(cluster)
+        if cell is None:
+            cell = members[cluster] = [0, 0.0, 0.0]
+        cell[0] += 1
+        cell[1] += pos["x"]
+        cell[2] += pos["y"]
+
+    nodes_data = []
+    for node in focus:
+        if node in positions:
+            nodes_data.append({
+                "id": node,
+                "label": str(node),
+                "x": positions[node]["x"],
+                "y": positions[node]["y"],
+            })
+    for cluster, (count, sx, sy) in members.items():
+        nodes_data.append({
+            "id": cluster,
+            "label": f"{count:,}",
+            "x": sx / count,
+            "y": sy / count,
+            "isCluster": True,
+            "count": count,
+            "size": cluster_size(count),
+        })
+
+    merged = {}
+    edges_data = []
+    for u, v, w in G.edges(data="weight"):
+        a, b = owner[u], owner[v]
+        if a == b:
+            continue
+        if u in focus and v in focus:
+            edges_data.append({"from": u, "to": v, "weight": w})
+            continue
+        edge = merged.get((a, b))
+        if edge is None:
+            merged[a, b] = [1, w]
+        else:
+            edge[0] += 1
+            edge[1] = min(edge[1], w)
+    busiest = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)
+    for (a, b), (count, w) in busiest[:settings.max_cluster_edges]:
+        edges_data.append({"from": a, "to": b, "weight": w, "count": count})
+    return nodes_data, edges_data
+
+
+def cluster_size(count):
+    """Radius for a cluster node holding ``count`` graph nodes."""
+    return 12 + 6 * math.log10(max(count, 1))
+
+
+class ChangeLog:
+    """Connections added since the view was last sent a full snapshot.
+
+    Entries are ``(version, u, v, weight)`` with the graph version the edge
+    was added at. ``base`` is the version of the snapshot the log starts
+    from; :meth:`reset` starts a new one (after a reset or import, on a
+    version gap, or once the log grows past ``limit`` and a snapshot is
+    cheaper than the delta).
+    """
+
+    def __init__(self, version=0, limit=5000):
+        self.limit = limit
+        self.reset(version)
+
+    def reset(self, version):
+        self.base = self.version = version
+        self._versions = []
+        self._edges = []
+
+    def record(self, version, u, v, weight):
+        """Log edge ``u → v`` as added at ``version`` (the version right after the last one)."""
+        if version != self.version + 1 or len(self._edges) >= self.limit:
+            # Something changed that the log did not see; start over
+            self.reset(version)
+            return
+        self._versions.append(version)
+        self._edges.append((u, v, weight))
+        self.version = version
+
+    def since(self, version):
+        """Return the ``(u, v, weight)`` edges added after ``version``.
+
+        Returns ``None`` when the log cannot bring a view at ``version`` up to
+        date, i.e. a full snapshot has to be sent instead.
+        """
+        if version is None or not self.base <= version <= self.version:
+            return None
+        return self._edges[bisect_right(self._versions, version):]
@@ -0,0 +1,120 @@
+"""A process-wide cache of query results, shared by every session.
+
+Results are keyed by :func:`graph_fingerprint`, a hash of the graph's
+content, plus whatever else the query depends on (algorithm, endpoints,
+options). Sessions that load the same topology therefore share answers,
+and a changed graph hashes differently, so its stale entries are simply
+never looked up again and age out of the LRU order.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from netsim.compact_graph import CompactGraph
+
+
+def graph_fingerprint(G, weight="weight"):
+    """Return a hex digest of ``G``'s nodes, edges and weights.
+
+    Nodes are hashed in iteration order and edges sorted by their endpoints'
+    positions in it, so a compact graph and a NetworkX graph built from the
+    same input hash alike. Hashing is one pass over the edges.
+    """
+    names = list(G.nodes())
+    if isinstance(G, CompactGraph):
+        offsets, targets, weights = G.csr()
+        sources = np.repeat(np.arange(len(names), dtype=np.int64), np.diff(offsets))
+        targets = targets.astype(np.int64)
+        weights = weights.astype(np.float64)
+    else:
+        index = {node: i for i, node in enumerate(names)}
+        edges = [(index[u], index[v], d.get(weight, 1)) for u, v, d in G.edges(data=True)]
+        sources = np.fromiter((e[0] for e in edges), dtype=np.int64, count=len(edges))
+        targets = np.fromiter((e[1] for e in edges), dtype=np.int64, count=len(edges))
+        weights = np.fromiter((e[2] for e in edges), dtype=np.float64, count=len(edges))
+        order = np.lexsort((targets, sources))
+        sources, targets, weights = sources[order], targets[order], weights[order]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join(map(repr, names)).encode("utf-8"))
+    for array in (sources, targets, weights):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Least-recently-used mapping with an entry limit and a size budget.
+
+    Every entry has a ``size`` (any unit the caller likes, e.g. nodes held);
+    the least recently used entries are evicted while there are more than
+    ``max_entries`` of them or their sizes add up to more than ``max_size``.
+    Safe to share between threads. Cached values are handed out as is, so
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries=256, max_size=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return the value for ``key`` (marking it recently used), or ``default``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=1):
+        """Store ``value`` under ``key``; a value larger than ``max_size`` is not kept."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            if self.max_size is not None and size > self.max_size:
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_size is not None and self.size > self.max_size)
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the counters and current occupancy as a dict."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
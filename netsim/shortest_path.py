@@ -0,0 +1,295 @@
+"""Single-source shortest paths on non-negatively weighted digraphs."""
+
+import math
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from itertools import count
+
+from netsim.adjacency import edge_weight, predecessors, successors
+from netsim.exceptions import NoPathError
+
+
+@dataclass
+class SearchResult:
+    """A path together with a record of the work spent finding it.
+
+    ``explored`` lists nodes in the order the search settled them,
+    ``relaxations`` counts examined edges and ``max_frontier`` is the largest
+    number of reached-but-unsettled nodes seen at once.
+    """
+
+    path: list
+    cost: float
+    explored: list = field(default_factory=list)
+    relaxations: int = 0
+    max_frontier: int = 0
+
+
+class ShortestPathTree:
+    """An instrumented Dijkstra search from one source that can be resumed.
+
+    :meth:`search` settles nodes only until the requested target is final and
+    keeps the heap, so a later query for a farther target picks up where the
+    previous one stopped and a nearer one is answered from ``pred`` in
+    O(path length). Every settle is recorded in ``order`` together with the
+    running relaxation count and frontier size, which is what the app
+    animates and reports.
+    """
+
+    def __init__(self, G, source, weight="weight"):
+        if source not in G:
+            raise NoPathError(f"Node {source!r} is not in the graph")
+        self.source = source
+        self.weight = weight
+        # Best known distance of every reached node; final once the node is
+        # settled and no cheaper entry is waiting in the heap.
+        self.dist = {source: 0}
+        self.pred = {}
+        self.order = []
+        self.position = {}
+        self.relaxations = []
+        self.frontier = []
+        self._relaxed = 0
+        self._tie = count()
+        self._heap = [(0, next(self._tie), source)]
+
+    def _heap_min(self):
+        heap, dist = self._heap, self.dist
+        while heap and heap[0][0] > dist[heap[0][2]]:
+            heappop(heap)
+        return heap[0][0] if heap else None
+
+    def is_final(self, node):
+        """Return whether ``node``'s distance can no longer change."""
+        if node not in self.position:
+            return False
+        lowest = self._heap_min()
+        return lowest is None or self.dist[node] <= lowest
+
+    @property
+    def exhausted(self):
+        """True once every node reachable from the source is settled."""
+        return self._heap_min() is None
+
+    def search(self, G, target=None):
+        """Resume Dijkstra until ``target`` is final (or everything is, if ``None``)."""
+        if target is not None and self.is_final(target):
+            return
+        succ = successors(G, self.weight)
+        heap, dist, pred = self._heap, self.dist, self.pred
+        tie = self._tie
+        position = self.position
+        while heap:
+            if target in position and heap[0][0] >= dist[target]:
+                return
+            d, _, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, w in succ(u):
+                self._relaxed += 1
+                nd = d + w
+                if v not in dist or nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    heappush(heap, (nd, next(tie), v))
+            if u not in position:
+                position[u] = len(self.order)
+                self.order.append(u)
+                self.relaxations.append(self._relaxed)
+                self.frontier.append(len(dist) - len(self.order))
+            if u == target:
+                return
+
+    def distance(self, target):
+        try:
+            return self.dist[target]
+        except KeyError:
+            raise NoPathError(f"No path exists between {self.source!r} and {target!r}") from None
+
+    def path_to(self, target):
+        if target not in self.dist:
+            raise NoPathError(f"No path exists between {self.source!r} and {target!r}")
+        path = [target]
+        pred = self.pred
+        while path[-1] in pred:
+            path.append(pred[path[-1]])
+        path.reverse()
+        return path
+
+    def query(self, G, target):
+        """Return the :class:`SearchResult` for ``target``, searching only as far as needed."""
+        self.search(G, target)
+        if target not in self.position:
+            raise NoPathError(f"No path exists between {self.source!r} and {target!r}")
+        settled = self.position[target] + 1
+        return SearchResult(
+            path=self.path_to(target),
+            cost=self.dist[target],
+            explored=self.order[:settled],
+            relaxations=self.relaxations[settled - 1],
+            max_frontier=max(self.frontier[:settled]),
+        )
+
+    def relax_edge(self, G, u, v, weight=None):
+        """Account for edge ``u → v`` having been added or made cheaper in ``G``.
+
+        If the edge improves ``v``, the new label is pushed onto the search
+        heap and the next :meth:`search` propagates it through the affected
+        subtree only, re-settling just the nodes whose distance drops (the
+        decrease case of dynamic SSSP). Returns whether ``v`` improved.
+
+        Weight *increases* cannot be repaired this way; callers must rebuild
+        the tree when an increased edge is one of its ``pred`` links.
+        """
+        du = self.dist.get(u)
+        if du is None:
+            return False
+        nd = du + edge_weight(G, u, v, weight or self.weight)
+        if v in self.dist and nd >= self.dist[v]:
+            return False
+        self.dist[v] = nd
+        self.pred[v] = u
+        heappush(self._heap, (nd, next(self._tie), v))
+        return True
+
+
+def distances_to(G, target, weight="weight"):
+    """Run Dijkstra backwards from ``target`` over the whole graph.
+
+    Returns ``(dist, hop, order)``: every node's distance *to* ``target``,
+    its next hop on a shortest route there, and the settle order. The
+    distances are an exact A* estimate for ``target`` and stay admissible
+    when edges or nodes are removed, which is what the failover and
+    what-if searches use them for.
+    """
+    pred = predecessors(G, weight)
+    dist = {target: 0}
+    hop = {}
+    order = []
+    done = set()
+    tie = count()
+    heap = [(0, next(tie), target)]
+    while heap:
+        d, _, v = heappop(heap)
+        if v in done:
+            continue
+        done.add(v)
+        order.append(v)
+        for u, w in pred(v):
+            nd = d + w
+            if u not in dist or nd < dist[u]:
+                dist[u] = nd
+                hop[u] = v
+                heappush(heap, (nd, next(tie), u))
+    return dist, hop, order
+
+
+def dijkstra(G, source, target=None, weight="weight"):
+    """Run Dijkstra from ``source``, stopping once ``target`` is settled.
+
+    Returns the (resumable) :class:`ShortestPathTree`; without ``target`` the
+    whole reachable graph is settled.
+    """
+    tree = ShortestPathTree(G, source, weight=weight)
+    tree.search(G, target)
+    return tree
+
+
+def astar(G, source, target, heuristic, weight="weight"):
+    """Find a shortest path with A* guided by ``heuristic(node)``.
+
+    ``heuristic`` must never overestimate the remaining distance (see
+    :mod:`netsim.heuristics`); nodes are re-opened if a cheaper route shows
+    up, so the result is exact even for an inconsistent one.
+    """
+    if source not in G or target not in G:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    succ = successors(G, weight)
+    tie = count()
+    cost = {source: 0}
+    pred = {}
+    closed = {}
+    explored = []
+    relaxations = 0
+    max_frontier = 0
+    heap = [(heuristic(source), next(tie), source, 0)]
+    while heap:
+        _, _, u, g = heappop(heap)
+        if g > cost[u] or closed.get(u, g + 1) <= g:
+            continue
+        if u not in closed:
+            explored.append(u)
+        closed[u] = g
+        if u == target:
+            break
+        for v, w in succ(u):
+            relaxations += 1
+            ng = g + w
+            if v not in cost or ng < cost[v]:
+                cost[v] = ng
+                pred[v] = u
+                heappush(heap, (ng + heuristic(v), next(tie), v, ng))
+        max_frontier = max(max_frontier, len(cost) - len(closed))
+    if target not in closed:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    path = [target]
+    while path[-1] != source:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return SearchResult(path, cost[target], explored, relaxations, max_frontier)
+
+
+def bidirectional_dijkstra(G, source, target, weight="weight"):
+    """Find a shortest path by growing Dijkstra balls from both endpoints.
+
+    The two searches alternate (the smaller frontier goes next) and stop as
+    soon as their smallest keys add up to the best meeting cost, which
+    usually settles far fewer nodes than a one-sided search.
+    """
+    if source not in G or target not in G:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    if source == target:
+        return SearchResult([source], 0, [source])
+    neighbours = (successors(G, weight), predecessors(G, weight))
+    tie = count()
+    dist = ({source: 0}, {target: 0})
+    pred = ({}, {})
+    settled = (set(), set())
+    heaps = ([(0, next(tie), source)], [(0, next(tie), target)])
+    explored = []
+    seen = set()
+    relaxations = 0
+    max_frontier = 0
+    best, meet = math.inf, None
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        d, _, u = heappop(heaps[side])
+        if u in settled[side] or d > dist[side][u]:
+            continue
+        settled[side].add(u)
+        if u not in seen:
+            seen.add(u)
+            explored.append(u)
+        mine, other = dist[side], dist[1 - side]
+        for v, w in neighbours[side](u):
+            relaxations += 1
+            nd = d + w
+            if v not in mine or nd < mine[v]:
+                mine[v] = nd
+                pred[side][v] = u
+                heappush(heaps[side], (nd, next(tie), v))
+                if v in other and nd + other[v] < best:
+                    best, meet = nd + other[v], v
+        frontier = len(dist[0]) + len(dist[1]) - len(settled[0]) - len(settled[1])
+        max_frontier = max(max_frontier, frontier)
+    if meet is None:
+        raise NoPathError(f"No path exists between {source!r} and {target!r}")
+    path = [meet]
+    while path[-1] != source:
+        path.append(pred[0][path[-1]])
+    path.reverse()
+    while path[-1] != target:
+        path.append(pred[1][path[-1]])
+    return SearchResult(path, best, explored, relaxations, max_frontier)
@@ -0,0 +1,166 @@
+"""Named graphs saved on disk and opened memory-mapped.
+
+Each graph is a directory of flat ``.npy`` arrays (the CSR and reverse CSR
+of a :class:`~netsim.compact_graph.CompactGraph`, plus node positions when
+every node has one), the node names as one NUL-separated UTF-8 blob, and a
+small ``meta.json``. Opening a graph maps the arrays read-only instead of
+reading them, so it costs about as much as splitting the names, however
+many edges there are, and every process that opens the same graph shares
+one copy through the page cache. Within a process, one opened graph can be
+shared as long as nobody changes it; take a :meth:`CompactGraph.copy`
+first.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from netsim.compact_graph import CompactGraph
+
+FORMAT_VERSION = 1
+
+_ARRAYS = ("offsets", "targets", "weights", "reverse_offsets", "reverse_sources", "reverse_positions")
+
+
+class GraphStore:
+    """A directory of saved graphs, addressed by their display name."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        # Readable and filesystem-safe, with a hash so distinct names rarely
+        # collide; meta.json records the full name, which settles it when they do
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._")[:60] or "graph"
+        return os.path.join(self.root, f"{slug}-{zlib.crc32(name.encode('utf-8')):08x}")
+
+    def graphs(self):
+        """Return the ``meta.json`` of every saved graph, sorted by name."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for entry in os.scandir(self.root):
+            try:
+                with open(os.path.join(entry.path, "meta.json"), encoding="utf-8") as f:
+                    found.append(json.load(f))
+            except (OSError, ValueError):
+                # Half-written or foreign directories are skipped
+                continue
+        return sorted(found, key=lambda meta: meta["name"].lower())
+
+    def meta(self, name):
+        """Return the ``meta.json`` of graph ``name`` (``KeyError`` if there is none)."""
+        try:
+            with open(os.path.join(self._path(name), "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(name) from None
+        if meta.get("name") != name:
+            # Another name that maps to the same directory
+            raise KeyError(name)
+        return meta
+
+    def __contains__(self, name):
+        try:
+            self.meta(name)
+        except KeyError:
+            return False
+        return True
+
+    def save(self, name, G, positions=None):
+        """Save ``G`` (compact or NetworkX) as ``name``, replacing any earlier version.
+
+        ``positions`` (``{node: {"x", "y"}}``) is stored too if it covers
+        every node. Node names must be strings without NUL characters. The
+        new version is written next to the old one and swapped in with a
+        rename, so readers never see a half-written graph. Raises
+        ``ValueError`` if ``name`` maps to the same directory as another
+        saved graph.
+        """
+        if not isinstance(G, CompactGraph):
+            G = CompactGraph.from_networkx(G)
+        names = G.nodes()
+        if not all(isinstance(node, str) and "\0" not in node for node in names):
+            raise ValueError("Only graphs whose node names are strings without NUL characters can be saved")
+        offsets, targets, weights = G.csr()
+        reverse_offsets, reverse_sources, reverse_positions = G.reverse_csr()
+        arrays = {
+            "offsets": offsets, "targets": targets, "weights": weights,
+            "reverse_offsets": reverse_offsets, "reverse_sources": reverse_sources,
+            "reverse_positions": reverse_positions,
+        }
+        if positions is not None and all(node in positions for node in names):
+            arrays["positions"] = np.array([(positions[n]["x"], positions[n]["y"]) for n in names], dtype=np.float64)
+
+        os.makedirs(self.root, exist_ok=True)
+        final = self._path(name)
+        if os.path.exists(final) and name not in self:
+            raise ValueError(f"Graph {name!r} would overwrite another saved graph stored under the same file name; pick another name")
+        staging = tempfile.mkdtemp(prefix=".saving-", dir=self.root)
+        try:
+            for key, array in arrays.items():
+                np.save(os.path.join(staging, f"{key}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(staging, "names.bin"), "wb") as f:
+                f.write("\0".join(names).encode("utf-8"))
+            meta = {
+                "name": name,
+                "format": FORMAT_VERSION,
+                "nodes": len(names),
+                "edges": int(len(targets)),
+                "positions": "positions" in arrays,
+                "saved_at": time.time(),
+            }
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            if os.path.exists(final):
+                retired = tempfile.mkdtemp(prefix=".retired-", dir=self.root)
+                os.replace(final, os.path.join(retired, "graph"))
+                os.replace(staging, final)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.replace(staging, final)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return meta
+
+    def open(self, name, mmap=True):
+        """Return graph ``name`` as a :class:`CompactGraph` backed by read-only mapped arrays.
+
+        With ``mmap=False`` the arrays are read into memory instead. Raises
+        ``KeyError`` if there is no such graph.
+        """
+        path = self._path(name)
+        meta = self.meta(name)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Graph {name!r} was saved in an unsupported format ({meta.get('format')})")
+        mode = "r" if mmap else None
+        arrays = {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode=mode) for key in _ARRAYS}
+        with open(os.path.join(path, "names.bin"), "rb") as f:
+            blob = f.read().decode("utf-8")
+        names = blob.split("\0") if meta["nodes"] else []
+        reverse = (arrays["reverse_offsets"], arrays["reverse_sources"], arrays["reverse_positions"])
+        return CompactGraph.from_arrays(names, arrays["offsets"], arrays["targets"], arrays["weights"], reverse)
+
+    def positions(self, name):
+        """Return the saved ``{node: {"x", "y"}}`` layout of ``name``, or ``None``."""
+        path = self._path(name)
+        if not self.meta(name).get("positions"):
+            return None
+        with open(os.path.join(path, "names.bin"), "rb") as f:
+            names = f.read().decode("utf-8").split("\0")
+        xy = np.load(os.path.join(path, "positions.npy")).tolist()
+        return {node: {"x": x, "y": y} for node, (x, y) in zip(names, xy)}
+
+    def delete(self, name):
+        """Remove graph ``name``; processes that have it open keep their mapping."""
+        path = self._path(name)
+        if name not in self:
+            raise KeyError(name)
+        shutil.rmtree(path)
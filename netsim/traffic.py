@@ -0,0 +1,277 @@
+"""Discrete-event simulation of packet traffic over the graph.
+
+Flows inject packets between node pairs at a given rate, and every packet
+follows its flow's shortest path, with edge weights taken as propagation
+latency. Each link sends one packet at a time at its capacity (packets per
+time unit) from a FIFO buffer, and drops arrivals when the buffer is full.
+
+Events live in one heap of plain tuples: an injection per flow (which
+schedules the flow's next one) and one arrival per packet and hop. A FIFO
+link needs no events of its own, because a packet's departure follows
+from the time the link frees up (the Lindley recursion), so the cost is a
+push and a pop per hop. Inter-arrival gaps are drawn from NumPy in blocks.
+"""
+
+from array import array
+from dataclasses import dataclass
+from heapq import heappop, heappush
+
+import numpy as np
+
+from netsim.adjacency import edge_weight
+from netsim.shortest_path import ShortestPathTree
+
+# Inter-arrival gaps drawn per flow at a time
+GAP_BLOCK = 4096
+# Latency percentiles in reports
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Flow:
+    """Packets from ``source`` to ``target`` at ``rate`` per time unit.
+
+    Arrivals are a Poisson process, or evenly spaced with ``poisson=False``.
+    """
+
+    source: object
+    target: object
+    rate: float
+    poisson: bool = True
+
+
+@dataclass
+class TrafficReport:
+    """State at ``time``; ``throughput`` and ``latency`` cover the last interval only."""
+
+    time: float
+    events: int
+    injected: int
+    delivered: int
+    dropped: int
+    in_flight: int
+    throughput: float
+    latency: dict
+
+    def as_row(self):
+        row = {
+            "time": self.time,
+            "events": self.events,
+            "injected": self.injected,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "in flight": self.in_flight,
+            "throughput": self.throughput,
+        }
+        row.update((f"p{q} latency", value) for q, value in self.latency.items())
+        return row
+
+
+@dataclass
+class LinkLoad:
+    """What one link carried: ``utilization`` is the busy fraction of the elapsed time."""
+
+    edge: tuple
+    capacity: float
+    latency: float
+    forwarded: int
+    dropped: int
+    utilization: float
+    max_queue: float
+
+    def as_row(self):
+        return {
+            "link": f"{self.edge[0]} → {self.edge[1]}",
+            "capacity": self.capacity,
+            "latency": self.latency,
+            "forwarded": self.forwarded,
+            "dropped": self.dropped,
+            "utilization": self.utilization,
+            "max queue": self.max_queue,
+        }
+
+
+def _percentiles(values):
+    if not len(values):
+        return {q: None for q in PERCENTILES}
+    return dict(zip(PERCENTILES, np.percentile(np.frombuffer(values, dtype=np.float64), PERCENTILES).tolist()))
+
+
+class TrafficSimulation:
+    """Packet-level simulation of ``flows`` on ``G``, advanced with :meth:`step` or :meth:`run`.
+
+    Every link has ``capacity`` packets per time unit (``capacities`` maps
+    ``(u, v)`` to an override) and holds at most ``buffer`` packets,
+    counting the one being sent. Flows are routed once, up front, along
+    their shortest path; raises :class:`~netsim.exceptions.NoPathError` if
+    one has none. Only links on some route are modelled.
+    """
+
+    def __init__(self, G, flows, capacity=100.0, capacities=None, buffer=64, seed=None, weight="weight"):
+        self.flows = list(flows)
+        self.now = 0.0
+        self.events = 0
+        self._rng = np.random.default_rng(seed)
+        capacities = capacities or {}
+
+        # Links on the routes, as parallel lists indexed by link id
+        self.links = []
+        link_ids = {}
+        self._capacity, self._service, self._delay, self._buffer = [], [], [], []
+        self._routes = []
+        trees = {}
+        for flow in self.flows:
+            tree = trees.get(flow.source)
+            if tree is None:
+                tree = trees[flow.source] = ShortestPathTree(G, flow.source, weight=weight)
+            tree.search(G, flow.target)
+            path = tree.path_to(flow.target)
+            route = []
+            for edge in zip(path, path[1:]):
+                link = link_ids.get(edge)
+                if link is None:
+                    link = link_ids[edge] = len(self.links)
+                    rate = capacities.get(edge, capacity)
+                    self.links.append(edge)
+                    self._capacity.append(rate)
+                    self._service.append(1.0 / rate)
+                    self._delay.append(edge_weight(G, edge[0], edge[1], weight))
+                    self._buffer.append(buffer)
+                route.append(link)
+            self._routes.append(tuple(route))
+
+        n = len(self.links)
+        self._free_at = [0.0] * n
+        self._busy = [0.0] * n
+        self._forwarded = [0] * n
+        self._link_drops = [0] * n
+        self._max_queue = [0.0] * n
+        self.injected = [0] * len(self.flows)
+        self.delivered = [0] * len(self.flows)
+        self.dropped = [0] * len(self.flows)
+        self.latencies = array("d")
+        self._reported = (0.0, 0, 0)
+
+        self._gaps = [[] for _ in self.flows]
+        self._heap = []
+        for f, flow in enumerate(self.flows):
+            if flow.rate > 0:
+                self._heap.append((self._gap(f), f, -1, 0.0))
+        self._heap.sort()
+
+    def _gap(self, f):
+        gaps = self._gaps[f]
+        if not gaps:
+            flow = self.flows[f]
+            if flow.poisson:
+                gaps.extend(self._rng.exponential(1.0 / flow.rate, GAP_BLOCK).tolist())
+            else:
+                gaps.extend([1.0 / flow.rate] * GAP_BLOCK)
+        return gaps.pop()
+
+    @property
+    def routes(self):
+        """Each flow's route as a list of nodes."""
+        return [[flow.source] + [self.links[link][1] for link in route] for flow, route in zip(self.flows, self._routes)]
+
+    def step(self, until):
+        """Process every event up to time ``until``; returns how many there were."""
+        heap, routes = self._heap, self._routes
+        free_at, service, delay, buffers = self._free_at, self._service, self._delay, self._buffer
+        capacity, busy, forwarded, max_queue = self._capacity, self._busy, self._forwarded, self._max_queue
+        injected, delivered, dropped, link_drops = self.injected, self.delivered, self.dropped, self._link_drops
+        latencies = self.latencies
+        gaps = self._gaps
+        processed = 0
+        while heap and heap[0][0] <= until:
+            t, f, hop, born = heappop(heap)
+            processed += 1
+            if hop < 0:
+                # Injection: schedule the flow's next packet, then send this one
+                heappush(heap, (t + (gaps[f].pop() if gaps[f] else self._gap(f)), f, -1, 0.0))
+                injected[f] += 1
+                hop, born = 0, t
+            route = routes[f]
+            if hop == len(route):
+                delivered[f] += 1
+                latencies.append(t - born)
+                continue
+            link = route[hop]
+            start = free_at[link]
+            if start > t:
+                # Packets ahead of this one, counting the one being sent
+                queue = (start - t) * capacity[link]
+                if queue >= buffers[link]:
+                    dropped[f] += 1
+                    link_drops[link] += 1
+                    continue
+                if queue > max_queue[link]:
+                    max_queue[link] = queue
+            else:
+                start = t
+            done = free_at[link] = start + service[link]
+            busy[link] += service[link]
+            forwarded[link] += 1
+            heappush(heap, (done + delay[link], f, hop + 1, born))
+        self.now = max(self.now, until)
+        self.events += processed
+        return processed
+
+    def run(self, duration, interval=None):
+        """Advance by ``duration``, yielding a :class:`TrafficReport` every ``interval``."""
+        end = self.now + duration
+        interval = interval or duration
+        while self.now < end:
+            self.step(min(self.now + interval, end))
+            yield self.report()
+
+    def report(self):
+        """Report on the interval since the previous report."""
+        since, delivered_before, latencies_before = self._reported
+        delivered = sum(self.delivered)
+        window = self.latencies[latencies_before:]
+        self._reported = (self.now, delivered, len(self.latencies))
+        injected, dropped = sum(self.injected), sum(self.dropped)
+        return TrafficReport(
+            time=self.now,
+            events=self.events,
+            injected=injected,
+            delivered=delivered,
+            dropped=dropped,
+            in_flight=injected - delivered - dropped,
+            throughput=(delivered - delivered_before) / (self.now - since) if self.now > since else 0.0,
+            latency=_percentiles(window),
+        )
+
+    def latency_percentiles(self):
+        """Latency percentiles over every delivered packet so far."""
+        return _percentiles(self.latencies)
+
+    def link_loads(self):
+        """One :class:`LinkLoad` per modelled link, busiest first."""
+        loads = []
+        for link, edge in enumerate(self.links):
+            # Work queued past now has not been done yet
+            busy = self._busy[link] - max(0.0, self._free_at[link] - self.now)
+            loads.append(LinkLoad(
+                edge, self._capacity[link], self._delay[link], self._forwarded[link], self._link_drops[link],
+                busy / self.now if self.now > 0 else 0.0, self._max_queue[link],
+            ))
+        loads.sort(key=lambda load: -load.utilization)
+        return loads
+
+    def flow_rows(self):
+        """Per-flow counters as table rows."""
+        return [
+            {
+                "source": flow.source,
+                "target": flow.target,
+                "rate": flow.rate,
+                "hops": len(route),
+                "injected": self.injected[f],
+                "delivered": self.delivered[f],
+                "dropped": self.dropped[f],
+                "loss": self.dropped[f] / self.injected[f] if self.injected[f] else 0.0,
+            }
+            for f, (flow, route) in enumerate(zip(self.flows, self._routes))
+        ]
@@ -0,0 +1,46 @@
+"""Streamlit component that keeps the vis.js network view alive across reruns.
+
+``components.html`` rebuilds and reloads the whole page on every rerun. This
+component is mounted once and patched in place: a rerun sends a full
+snapshot only when the browser has nothing usable, otherwise just the
+connections added since the version it shows, plus the (small) path overlay.
+Nodes dragged in the browser (and, with ``profile``, the time it took to
+draw each update) are reported back as the component's value.
+See ``frontend/index.html`` for the browser side.
+"""
+
+import os
+
+import streamlit.components.v1 as components
+
+_FRONTEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+
+_component = components.declare_component("network_view", path=_FRONTEND)
+
+
+def network_view(base, version, overlay, style, graph_name, animation_speed,
+                 snapshot=None, delta=None, profile=False, key=None):
+    """Render or patch the network view.
+
+    ``base`` names the snapshot lineage the browser must hold for ``delta``
+    to apply and ``version`` is the graph version after applying it.
+    Returns the browser's report (``None`` until it sends one): a dict with
+    a ``resync`` token that changes whenever it asks for a fresh snapshot,
+    and ``moved``, the ``{node: {"x", "y"}}`` positions of dragged nodes.
+    With ``profile`` the browser also times every snapshot or delta it
+    applies, up to the next redraw, and reports it as ``render``:
+    ``{"base", "version", "ms"}``.
+    """
+    return _component(
+        base=base,
+        version=version,
+        snapshot=snapshot,
+        delta=delta,
+        overlay=overlay,
+        style=style,
+        graphName=graph_name,
+        animationSpeed=animation_speed,
+        profile=profile,
+        key=key,
+        default=None,
+    )
@@ -1,22 +1,172 @@
 import streamlit as st
-import streamlit.components.v1 as components
 import networkx as nx
+import pandas as pd
+import io
 import json
+import os
+import time
+from bisect import bisect_left
+
+from netsim import CycleError, DistanceIndex, NoPathError, critical_path
+from netsim.alternatives import disjoint_paths, k_shortest_paths
+from netsim.batch import all_pairs, batch_routes
+from netsim.compact_graph import CompactGraph
+from netsim.components import ComponentIndex
+from netsim.contraction import ContractionHierarchy
+from netsim.failures import FailedView, link_failure_sweep, reroute
+from netsim.graph_io import FORMATS, detect_format, iter_edge_chunks, iter_flows, iter_node_coordinates, iter_pairs
+from netsim.heuristics import coordinate_scale, euclidean, haversine, make_heuristic
+from netsim.layout import extend_layout
+from netsim.maxflow import FlowNetwork
+from netsim.profiling import ProfileHistory, StageTimer
+from netsim.render import (
+    MODES, STYLES, ChangeLog, RenderSettings, choose_mode, detail_payload, overview_payload, path_neighborhood
+)
+from netsim.result_cache import ResultCache, graph_fingerprint
+from netsim.shortest_path import astar, bidirectional_dijkstra, distances_to
+from netsim.traffic import Flow, TrafficSimulation
+from netsim.store import GraphStore
+from network_view import network_view
 
 # Page configuration
 st.set_page_config(page_title="Network Pathfinding Simulator", layout="wide")
 
+# Times the stages of this rerun; only kept when profiling is switched on
+timer = StageTimer()
+
+# Larger graphs get a search box in front of the node pickers
+NODE_PICKER_LIMIT = 1000
+
+# Snapshots kept for reuse, one per snapshot lineage (render mode, overview focus)
+VIEW_PAYLOAD_LIMIT = 4
+
+# Saved graphs live here, shared by every session of this server
+graph_store = GraphStore(os.environ.get(
+    "NETSIM_GRAPH_STORE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "graph_store")
+))
+
+
+@st.cache_resource(max_entries=8)
+def open_shared_graph(name, saved_at):
+    """Memory-map a saved graph once per server; sessions use it read-only.
+
+    ``saved_at`` is only part of the cache key, so saving again opens the new version.
+    """
+    return graph_store.open(name)
+
+
+# Simulation results shared by all sessions; the size budget counts nodes held
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_NODES = 2_000_000
+
+
+@st.cache_resource
+def shared_results():
+    """The process-wide result cache, keyed by graph content and query."""
+    return ResultCache(RESULT_CACHE_ENTRIES, RESULT_CACHE_NODES)
+
+
+@st.cache_resource(max_entries=4)
+def shared_hierarchy(fingerprint, _graph):
+    """Contraction hierarchy of the graph with content hash ``fingerprint``, built once per server."""
+    return ContractionHierarchy(_graph)
+
 # Initialize session state
+if 'compact_storage' not in st.session_state:
+    st.session_state.compact_storage = False
 if 'graph' not in st.session_state:
     st.session_state.graph = nx.DiGraph()
-if 'edges' not in st.session_state:
-    st.session_state.edges = []
 if 'graph_name' not in st.session_state:
     st.session_state.graph_name = "My Network"
 if 'animation_speed' not in st.session_state:
     st.session_state.animation_speed = 500
 if 'node_positions' not in st.session_state:
     st.session_state.node_positions = {}
+if 'graph_version' not in st.session_state:
+    st.session_state.graph_version = 0
+if 'distance_index' not in st.session_state:
+    st.session_state.distance_index = DistanceIndex()
+if 'component_index' not in st.session_state:
+    # Strongly connected components and their reachability, tagged with the graph version
+    st.session_state.component_index = ComponentIndex(st.session_state.graph, st.session_state.graph_version)
+if 'node_coords' not in st.session_state:
+    st.session_state.node_coords = {}
+if 'heuristic_scales' not in st.session_state:
+    st.session_state.heuristic_scales = {}
+if 'render_settings' not in st.session_state:
+    st.session_state.render_settings = RenderSettings()
+if 'view_log' not in st.session_state:
+    st.session_state.view_log = ChangeLog(st.session_state.graph_version)
+if 'view_sent' not in st.session_state:
+    # (snapshot lineage, graph version) the browser's network view shows
+    st.session_state.view_sent = None
+if 'connections_table' not in st.session_state:
+    # (graph version, every connection as a table)
+    st.session_state.connections_table = None
+if 'connections_view' not in st.session_state:
+    # ((graph version, search), connections table filtered by the search)
+    st.session_state.connections_view = None
+if 'sorted_nodes' not in st.session_state:
+    # (graph version, node names in sorted order) for the node pickers
+    st.session_state.sorted_nodes = None
+if 'batch_report' not in st.session_state:
+    # (graph version, results table, stats) of the last batch run
+    st.session_state.batch_report = None
+if 'traffic_report' not in st.session_state:
+    # (graph version, per-interval reports, link table, flow table, stats) of the last traffic run
+    st.session_state.traffic_report = None
+if 'flow_network' not in st.session_state:
+    # ((graph version, failures), residual network) of the last max-flow run
+    st.session_state.flow_network = None
+if 'view_value' not in st.session_state:
+    # Last value the network view reported (resync token and dragged positions)
+    st.session_state.view_value = None
+if 'view_overlay' not in st.session_state:
+    # (simulation inputs, overlay) of the last run, kept until the inputs change
+    st.session_state.view_overlay = None
+if 'view_payloads' not in st.session_state:
+    # {snapshot lineage: ((graph version, layout version), snapshot)}, newest last
+    st.session_state.view_payloads = {}
+if 'layout_version' not in st.session_state:
+    # Bumped whenever positions change without the graph changing (dragging)
+    st.session_state.layout_version = 0
+if 'target_distances' not in st.session_state:
+    # ((graph version, target), every node's distance to target) for rerouting
+    st.session_state.target_distances = None
+if 'graph_fingerprint' not in st.session_state:
+    # (graph version, content hash) keying this session's shared cache entries
+    st.session_state.graph_fingerprint = None
+if 'graph_shared' not in st.session_state:
+    # True while the graph is a saved one shared with other sessions
+    st.session_state.graph_shared = False
+if 'run_count' not in st.session_state:
+    st.session_state.run_count = 0
+if 'profile_history' not in st.session_state:
+    st.session_state.profile_history = ProfileHistory()
+
+
+def own_graph():
+    """Give this session a private copy of a shared (opened) graph before it is changed."""
+    if st.session_state.graph_shared:
+        st.session_state.graph = st.session_state.graph.copy()
+        st.session_state.graph_shared = False
+
+
+def open_saved_graph(name):
+    """Switch to saved graph ``name``; runs as a button callback, before the widgets."""
+    meta = graph_store.meta(name)
+    st.session_state.graph = open_shared_graph(name, meta['saved_at'])
+    st.session_state.graph_shared = True
+    st.session_state.compact_storage = True
+    st.session_state.graph_name = name
+    # Dropping the widget states makes them pick up the new values
+    st.session_state.pop('compact_storage_input', None)
+    st.session_state.pop('graph_name_input', None)
+    st.session_state.node_positions = graph_store.positions(name) or {}
+    st.session_state.graph_version += 1
+    st.session_state.distance_index.sync(st.session_state.graph_version)
+    st.session_state.view_log.reset(st.session_state.graph_version)
+
 
 # Title
 st.title("🔗 Network Pathfinding Simulator")
@@ -32,6 +182,21 @@ with st.sidebar:
     if graph_name != st.session_state.graph_name:
         st.session_state.graph_name = graph_name
     
+    # Storage backend: NetworkX dict-of-dicts or compact CSR arrays
+    compact_storage = st.checkbox(
+        "🗜️ Compact storage (CSR arrays)",
+        value=st.session_state.compact_storage,
+        key="compact_storage_input",
+        help="Keep the graph in flat arrays instead of NetworkX dictionaries. Recommended for large imported topologies."
+    )
+    if compact_storage != st.session_state.compact_storage:
+        st.session_state.compact_storage = compact_storage
+        st.session_state.graph_shared = False
+        if compact_storage:
+            st.session_state.graph = CompactGraph.from_networkx(st.session_state.graph)
+        else:
+            st.session_state.graph = st.session_state.graph.to_networkx()
+    
     st.markdown("---")
     st.subheader("Add Connection")
     
@@ -48,8 +213,29 @@ with st.sidebar:
         if st.button("➕ Add Connection", use_container_width=True):
             if source and target:
                 if source.strip() and target.strip():
+                    old_edge = st.session_state.graph.get_edge_data(source.strip(), target.strip())
+                    old_weight = old_edge['weight'] if old_edge else None
+                    own_graph()
                     st.session_state.graph.add_edge(source.strip(), target.strip(), weight=weight)
-                    st.session_state.edges.append((source.strip(), target.strip(), weight))
+                    st.session_state.graph_version += 1
+                    # Repair cached shortest-path trees instead of recomputing them
+                    st.session_state.distance_index.edge_added(
+                        st.session_state.graph, source.strip(), target.strip(),
+                        old_weight=old_weight,
+                        version=st.session_state.graph_version
+                    )
+                    st.session_state.component_index.edge_added(
+                        st.session_state.graph, source.strip(), target.strip(),
+                        version=st.session_state.graph_version
+                    )
+                    flow_network = st.session_state.flow_network
+                    if flow_network and flow_network[0] == (st.session_state.graph_version - 1, None):
+                        # Only one capacity changed, so the last flow is still a valid start
+                        flow_network[1].set_capacity(source.strip(), target.strip(), weight)
+                        st.session_state.flow_network = ((st.session_state.graph_version, None), flow_network[1])
+                    st.session_state.view_log.record(
+                        st.session_state.graph_version, source.strip(), target.strip(), weight
+                    )
                     st.success(f"Added: {source} → {target} (Weight: {weight})")
                     st.rerun()
                 else:
@@ -59,42 +245,194 @@ with st.sidebar:
     
     with col_btn2:
         if st.button("🗑️ Reset Graph", use_container_width=True):
-            st.session_state.graph = nx.DiGraph()
-            st.session_state.edges = []
+            st.session_state.graph = CompactGraph() if st.session_state.compact_storage else nx.DiGraph()
+            st.session_state.graph_shared = False
             st.session_state.node_positions = {}
+            st.session_state.graph_version += 1
+            st.session_state.view_log.reset(st.session_state.graph_version)
             st.success("Graph cleared!")
             st.rerun()
     
+    st.markdown("---")
+    st.subheader("📥 Import Graph")
+    uploaded_file = st.file_uploader(
+        "Edge list, CSV, GraphML or JSON",
+        type=["csv", "tsv", "txt", "edges", "edgelist", "graphml", "xml", "json", "jsonl", "ndjson"],
+        key="import_file"
+    )
+    import_format = st.selectbox(
+        "Format",
+        options=["auto"] + list(FORMATS),
+        format_func=lambda f: "Detect from file name" if f == "auto" else FORMATS[f],
+        key="import_format"
+    )
+    replace_graph = st.checkbox("Replace current graph", value=True, key="import_replace")
+    
+    if st.button("📥 Import", use_container_width=True, disabled=uploaded_file is None):
+        fmt = detect_format(uploaded_file.name) if import_format == "auto" else import_format
+        if fmt is None:
+            st.error("Could not detect the file format, please choose one")
+        else:
+            if replace_graph:
+                st.session_state.graph = CompactGraph() if st.session_state.compact_storage else nx.DiGraph()
+                st.session_state.graph_shared = False
+                st.session_state.node_positions = {}
+            else:
+                own_graph()
+            
+            # Stream the file in chunks and add each chunk to the graph in one batch
+            progress = st.progress(0.0, text="Importing...")
+            imported = 0
+            uploaded_file.seek(0)
+            try:
+                for chunk in iter_edge_chunks(uploaded_file, fmt):
+                    st.session_state.graph.add_weighted_edges_from(chunk)
+                    imported += len(chunk)
+                    progress.progress(
+                        min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0),
+                        text=f"Imported {imported:,} connections"
+                    )
+                import_error = None
+            except ValueError as e:
+                import_error = e
+            
+            st.session_state.graph_version += 1
+            st.session_state.distance_index.sync(st.session_state.graph_version)
+            st.session_state.view_log.reset(st.session_state.graph_version)
+            if import_error is None:
+                st.rerun()
+            st.error(f"❌ Import stopped after {imported:,} connections: {import_error}")
+    
+    st.markdown("---")
+    st.subheader("💾 Saved Graphs")
+    if st.button(f"💾 Save as \"{st.session_state.graph_name}\"", use_container_width=True,
+                 disabled=st.session_state.graph.number_of_nodes() == 0):
+        try:
+            with st.spinner("Saving..."):
+                graph_store.save(st.session_state.graph_name, st.session_state.graph, st.session_state.node_positions)
+            st.success(f"Saved \"{st.session_state.graph_name}\"")
+        except (ValueError, OSError) as e:
+            st.error(f"❌ Could not save: {e}")
+    saved_graphs = {meta['name']: meta for meta in graph_store.graphs()}
+    if saved_graphs:
+        saved_name = st.selectbox(
+            "Saved graph",
+            options=list(saved_graphs),
+            format_func=lambda n: f"{n} ({saved_graphs[n]['nodes']:,} nodes, {saved_graphs[n]['edges']:,} edges)",
+            key="saved_graph"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("📂 Open", use_container_width=True, on_click=open_saved_graph, args=(saved_name,))
+        with col2:
+            if st.button("🗑️ Delete", use_container_width=True, key="delete_saved_graph"):
+                graph_store.delete(saved_name)
+                st.rerun()
+    else:
+        st.caption("No saved graphs yet")
+    
     st.markdown("---")
     st.subheader("📋 Current Connections")
-    if st.session_state.edges:
-        for src, tgt, wgt in st.session_state.edges:
-            st.text(f"{src} → {tgt} : {wgt}")
+    if st.session_state.graph.number_of_edges() > 0:
+        connection_search = st.text_input("Search connections", placeholder="Node name", key="connection_search").strip()
+        
+        # The table is built once per graph version, and each search filters that copy
+        if st.session_state.connections_table is None or st.session_state.connections_table[0] != st.session_state.graph_version:
+            st.session_state.connections_table = (
+                st.session_state.graph_version,
+                pd.DataFrame(list(st.session_state.graph.edges(data='weight')), columns=["From", "To", "Weight"])
+            )
+        view_key = (st.session_state.graph_version, connection_search)
+        if st.session_state.connections_view is None or st.session_state.connections_view[0] != view_key:
+            table = st.session_state.connections_table[1]
+            if connection_search:
+                table = table[
+                    table["From"].astype(str).str.contains(connection_search, case=False, regex=False)
+                    | table["To"].astype(str).str.contains(connection_search, case=False, regex=False)
+                ]
+            st.session_state.connections_view = (view_key, table)
+        table = st.session_state.connections_view[1]
+        
+        # Only the current page goes to the browser
+        page_size = st.selectbox("Rows per page", options=[25, 50, 100, 250], key="connection_page_size")
+        pages = max(1, -(-len(table) // page_size))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key="connection_page")
+        first = (min(page, pages) - 1) * page_size
+        st.dataframe(table.iloc[first:first + page_size], use_container_width=True, hide_index=True)
+        st.caption(f"Showing {min(first + 1, len(table)):,}–{min(first + page_size, len(table)):,} of {len(table):,} connections")
     else:
         st.info("No connections yet")
     
     st.markdown("---")
     st.metric("Total Nodes", st.session_state.graph.number_of_nodes())
     st.metric("Total Edges", st.session_state.graph.number_of_edges())
+    if st.session_state.compact_storage:
+        st.caption(f"CSR arrays: {st.session_state.graph.nbytes / 1024:,.1f} KB")
+    
+    st.markdown("---")
+    with st.expander("🖥️ Rendering"):
+        render_override = st.radio(
+            "Level of detail",
+            options=["auto"] + list(MODES),
+            format_func=lambda m: {"auto": "Automatic", "full": "Full detail", "lite": "Lite (no shadows/labels)", "overview": "Clustered overview"}[m],
+            key="render_override"
+        )
+        settings = st.session_state.render_settings
+        settings.lite_nodes = st.number_input("Lite mode above (nodes)", min_value=10, value=settings.lite_nodes, step=50, key="lite_nodes")
+        settings.overview_nodes = st.number_input("Overview above (nodes)", min_value=50, value=settings.overview_nodes, step=500, key="overview_nodes")
+        settings.overview_edges = st.number_input("Overview above (edges)", min_value=50, value=settings.overview_edges, step=1000, key="overview_edges")
+        settings.neighborhood_hops = st.number_input("Path neighbourhood (hops)", min_value=0, max_value=5, value=settings.neighborhood_hops, key="neighborhood_hops")
+    
+    with st.expander("⏱️ Profiling"):
+        profiling = st.checkbox("Time each rerun", key="profiling")
+        # Filled in at the end of the rerun, once every stage has been timed
+        profile_panel = st.container()
 
 # Main area - Simulation Controls
 if st.session_state.graph.number_of_nodes() > 0:
-    nodes_list = sorted(list(st.session_state.graph.nodes()))
+    # Sort the node names once per graph version
+    if st.session_state.sorted_nodes is None or st.session_state.sorted_nodes[0] != st.session_state.graph_version:
+        st.session_state.sorted_nodes = (st.session_state.graph_version, sorted(st.session_state.graph.nodes()))
+    nodes_list = st.session_state.sorted_nodes[1]
+    
+    def node_options(prefix, selected):
+        """Nodes for a picker: all of them on small graphs, else the first matches of ``prefix``."""
+        if len(nodes_list) <= NODE_PICKER_LIMIT:
+            return nodes_list
+        first = bisect_left(nodes_list, prefix)
+        options = [node for node in nodes_list[first:first + NODE_PICKER_LIMIT] if node.startswith(prefix)]
+        # Keep the current choice selectable while the search changes
+        if selected in st.session_state.graph and selected not in options:
+            options.insert(0, selected)
+        return options
     
     st.header("🎯 Pathfinding Simulation")
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        start_node = st.selectbox("Select Start Node", options=nodes_list, key="start")
+        start_search = ""
+        if len(nodes_list) > NODE_PICKER_LIMIT:
+            start_search = st.text_input("Find start node", placeholder="Name starts with...", key="start_search")
+        start_node = st.selectbox("Select Start Node", options=node_options(start_search, st.session_state.get("start")), key="start")
     
     with col2:
-        end_node = st.selectbox("Select Destination Node", options=nodes_list, key="end")
+        end_search = ""
+        if len(nodes_list) > NODE_PICKER_LIMIT:
+            end_search = st.text_input("Find destination node", placeholder="Name starts with...", key="end_search")
+        end_node = st.selectbox("Select Destination Node", options=node_options(end_search, st.session_state.get("end")), key="end")
     
     with col3:
         algorithm = st.radio(
             "Algorithm",
-            options=["Find Shortest Path (Dijkstra)", "Find Critical Path (Longest Path)"],
+            options=[
+                "Find Shortest Path (Dijkstra)",
+                "Find Shortest Path (A*)",
+                "Find Shortest Path (Bidirectional Dijkstra)",
+                "Find Alternative Paths (Failover)",
+                "Find Maximum Flow (Min Cut)",
+                "Find Critical Path (Longest Path)"
+            ],
             key="algorithm"
         )
     
@@ -108,478 +446,395 @@ if st.session_state.graph.number_of_nodes() > 0:
         )
         st.session_state.animation_speed = animation_speed
     
+    use_contraction = False
+    if algorithm == "Find Shortest Path (Dijkstra)":
+        with st.expander("⚡ Query Acceleration"):
+            use_contraction = st.checkbox(
+                "Answer through a contraction hierarchy",
+                key="use_contraction",
+                help="Preprocesses the graph once (shared by everyone viewing the same graph), then answers "
+                     "each query by searching only a few hundred nodes. Worth it for large graphs that are queried often."
+            )
+    
+    if algorithm == "Find Shortest Path (A*)":
+        with st.expander("🧭 A* Heuristic", expanded=True):
+            heuristic_kind = st.radio(
+                "Distance estimate",
+                options=["layout", "geo"],
+                format_func=lambda k: "Layout distance (node x/y)" if k == "layout" else "Geographic distance (lat/lon)",
+                horizontal=True,
+                key="heuristic_kind"
+            )
+            if heuristic_kind == "geo":
+                coords_file = st.file_uploader("Node coordinates CSV (node, lat, lon)", type=["csv", "tsv", "txt"], key="coords_file")
+                if coords_file is not None and st.button("📍 Load Coordinates"):
+                    try:
+                        st.session_state.node_coords = {n: (lat, lon) for n, lat, lon in iter_node_coordinates(coords_file)}
+                        st.session_state.heuristic_scales.pop('geo', None)
+                    except ValueError as e:
+                        st.error(f"❌ Could not read coordinates: {e}")
+                st.caption(f"{len(st.session_state.node_coords):,} nodes have coordinates")
+    
+    alternative_options = None
+    if algorithm == "Find Alternative Paths (Failover)":
+        with st.expander("🔀 Alternative Paths", expanded=True):
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                alternative_kind = st.radio(
+                    "Routes",
+                    options=["shortest", "edge", "node"],
+                    format_func=lambda k: {"shortest": "K shortest (loopless)", "edge": "Edge-disjoint", "node": "Node-disjoint"}[k],
+                    horizontal=True,
+                    key="alternative_kind"
+                )
+            with col2:
+                alternative_count = st.number_input("How many (K)", min_value=2, max_value=20, value=3, key="alternative_count")
+            alternative_options = (alternative_kind, alternative_count)
+    
+    with st.expander("💥 Failure What-If"):
+        col1, col2 = st.columns(2)
+        with col1:
+            failed_links_text = st.text_area("Failed links (source,target per line)", key="failed_links")
+        with col2:
+            failed_nodes_text = st.text_area("Failed nodes (one per line)", key="failed_nodes")
+        sweep_links = st.checkbox("Sweep: fail each link of the found path in turn", key="sweep_links")
+        try:
+            failed_edges = {
+                (u, v) for u, v in iter_pairs(io.BytesIO(failed_links_text.encode("utf-8")))
+            } if failed_links_text.strip() else set()
+        except ValueError as e:
+            st.error(f"❌ Could not read failed links: {e}")
+            failed_edges = set()
+        failed_nodes = {n.strip() for n in failed_nodes_text.splitlines() if n.strip()}
+        unknown = [f"{u} → {v}" for u, v in failed_edges if not st.session_state.graph.has_edge(u, v)]
+        unknown += [n for n in failed_nodes if n not in st.session_state.graph]
+        if unknown:
+            st.warning(f"⚠️ Not in the graph: {', '.join(sorted(unknown)[:10])}")
+        failed_edges = {edge for edge in failed_edges if st.session_state.graph.has_edge(*edge)}
+        failed_nodes = {node for node in failed_nodes if node in st.session_state.graph}
+        if failed_edges or failed_nodes:
+            st.caption(f"Routing around {len(failed_edges):,} failed links and {len(failed_nodes):,} failed nodes")
+    # Algorithms run on a filtered view of the graph; nothing is copied
+    routing_graph = FailedView(st.session_state.graph, failed_edges, failed_nodes) if failed_edges or failed_nodes else st.session_state.graph
+    
+    def distances_to_target(target):
+        """Intact-graph distances to ``target``, kept per graph version for rerouting."""
+        key = (st.session_state.graph_version, target)
+        if st.session_state.target_distances is None or st.session_state.target_distances[0] != key:
+            st.session_state.target_distances = (key, distances_to(st.session_state.graph, target)[0])
+        return st.session_state.target_distances[1]
+    
+    def current_fingerprint():
+        """Content hash of the graph, computed once per graph version."""
+        if st.session_state.graph_fingerprint is None or st.session_state.graph_fingerprint[0] != st.session_state.graph_version:
+            st.session_state.graph_fingerprint = (st.session_state.graph_version, graph_fingerprint(st.session_state.graph))
+        return st.session_state.graph_fingerprint[1]
+    
+    def current_components():
+        """Component index of the graph, rebuilt only when it changed other than by added edges."""
+        st.session_state.component_index.sync(st.session_state.graph, st.session_state.graph_version)
+        return st.session_state.component_index
+    
     run_simulation = st.button("🚀 Run Simulation", type="primary", use_container_width=True)
     
     st.markdown("---")
     
+    timer.lap("controls")
+    
+    # Give every node a position up front; A* also uses them as coordinates
+    if not st.session_state.node_positions:
+        with st.spinner("Computing layout..."):
+            extend_layout(st.session_state.graph, st.session_state.node_positions)
+    else:
+        extend_layout(st.session_state.graph, st.session_state.node_positions)
+    timer.lap("layout")
+    
+    # Pick up what the browser reported since the last rerun
+    view_sent = st.session_state.view_sent
+    view_value = st.session_state.get("network_view") or {}
+    last_value = st.session_state.view_value or {}
+    if view_value != last_value:
+        st.session_state.view_value = view_value
+        if view_value.get('resync', 0) != last_value.get('resync', 0):
+            # The browser lost track (e.g. after a page reload) and wants a snapshot
+            view_sent = None
+        moved = {
+            node: position for node, position in view_value.get('moved', {}).items()
+            if node in st.session_state.graph and position != last_value.get('moved', {}).get(node)
+        }
+        if moved:
+            # Dragged nodes keep their place, and the layout heuristic has to be rescaled
+            st.session_state.node_positions.update(moved)
+            st.session_state.layout_version += 1
+            st.session_state.heuristic_scales.pop('layout', None)
+        render = view_value.get('render')
+        if render and render != last_value.get('render'):
+            # How long the browser took to draw what an earlier rerun sent
+            st.session_state.profile_history.attach((render['base'], render['version']), "client_render", render['ms'] / 1000)
+    
     # Calculate path if simulation is run
     path = None
     path_cost = None
     algo_name = None
     visited_nodes = []
+    search = None
+    cpm_result = None
+    flow_result = None
+    routes = []
+    intact_cost = None
+    sweep = None
+    cached_result = None
     
     if run_simulation and start_node and end_node:
+        results_cache = shared_results()
+        # A* is left out: its search depends on this session's coordinates
+        result_key = None if algorithm == "Find Shortest Path (A*)" else (
+            current_fingerprint(), algorithm, start_node, end_node,
+            alternative_options if algorithm == "Find Alternative Paths (Failover)" else use_contraction,
+            tuple(sorted(failed_edges)), tuple(sorted(failed_nodes)), sweep_links
+        )
+        cached_result = results_cache.get(result_key) if result_key else None
         try:
-            if algorithm == "Find Shortest Path (Dijkstra)":
-                path = nx.shortest_path(st.session_state.graph, source=start_node, target=end_node, weight='weight')
-                path_cost = nx.shortest_path_length(st.session_state.graph, source=start_node, target=end_node, weight='weight')
-                algo_name = "Shortest Path (Dijkstra)"
+            if cached_result is None:
+                # Answer from the components when there is nothing to search for.
+                # Failures only remove paths, so an intact graph that cannot reach
+                # the destination settles it, but only the intact graph's cycles count
+                components = current_components()
+                if algorithm == "Find Critical Path (Longest Path)" and routing_graph is st.session_state.graph:
+                    components.check_acyclic(routing_graph, start_node)
+                components.check_path(start_node, end_node)
+            if cached_result is not None:
+                # Someone already ran this exact query on this exact graph
+                path, path_cost, algo_name, visited_nodes, search, cpm_result, flow_result, routes, intact_cost, sweep = cached_result
+            elif algorithm == "Find Shortest Path (Dijkstra)":
+                if use_contraction:
+                    with st.spinner("Building the contraction hierarchy (once per graph)..."):
+                        hierarchy = shared_hierarchy(current_fingerprint(), st.session_state.graph)
+                    search = hierarchy.query(start_node, end_node, st.session_state.graph)
+                else:
+                    # One Dijkstra tree per start node, grown only as far as each query needs
+                    distance_index = st.session_state.distance_index
+                    distance_index.sync(st.session_state.graph_version)
+                    search = distance_index.query(st.session_state.graph, start_node, end_node)
+                if routing_graph is not st.session_state.graph:
+                    # The intact path stands unless a failure hits it
+                    intact_cost = search.cost
+                    search = reroute(routing_graph, start_node, end_node, search, distances_to_target(end_node))
+                path = search.path
+                path_cost = search.cost
+                algo_name = "Shortest Path (Contraction Hierarchy)" if use_contraction else "Shortest Path (Dijkstra)"
                 
-                # Simulate visited nodes for Dijkstra (BFS-like exploration)
-                visited_nodes = list(nx.single_source_shortest_path(st.session_state.graph, start_node).keys())
-            else:
-                G_neg = st.session_state.graph.copy()
-                for u, v, data in G_neg.edges(data=True):
-                    data['weight'] = -data['weight']
+                # Nodes in the order Dijkstra settled them before reaching the target
+                visited_nodes = search.explored
+            elif algorithm == "Find Shortest Path (A*)":
+                if heuristic_kind == "geo":
+                    coords, metric = st.session_state.node_coords, haversine
+                else:
+                    coords = {n: (p['x'], p['y']) for n, p in st.session_state.node_positions.items()}
+                    metric = euclidean
+                # The weight/distance scale needs one pass over the edges, so keep it per graph version
+                scale_key = (st.session_state.graph_version, heuristic_kind)
+                if st.session_state.heuristic_scales.get(heuristic_kind, (None,))[0] != scale_key:
+                    st.session_state.heuristic_scales[heuristic_kind] = (
+                        scale_key, coordinate_scale(st.session_state.graph, coords, metric)
+                    )
+                scale = st.session_state.heuristic_scales[heuristic_kind][1]
+                if scale == 0:
+                    st.warning("⚠️ Some nodes have no coordinates, so A* falls back to plain Dijkstra")
+                search = astar(
+                    routing_graph, start_node, end_node,
+                    make_heuristic(coords, end_node, scale, metric)
+                )
+                path = search.path
+                path_cost = search.cost
+                algo_name = "Shortest Path (A*)"
+                visited_nodes = search.explored
+            elif algorithm == "Find Shortest Path (Bidirectional Dijkstra)":
+                search = bidirectional_dijkstra(routing_graph, start_node, end_node)
+                path = search.path
+                path_cost = search.cost
+                algo_name = "Shortest Path (Bidirectional Dijkstra)"
+                visited_nodes = search.explored
+            elif algorithm == "Find Alternative Paths (Failover)":
+                alternative_kind, alternative_count = alternative_options
+                if alternative_kind == "shortest":
+                    routes = k_shortest_paths(routing_graph, start_node, end_node, alternative_count)
+                    algo_name = f"{len(routes)} Shortest Paths (Yen)"
+                else:
+                    routes = disjoint_paths(
+                        routing_graph, start_node, end_node, alternative_count,
+                        node_disjoint=alternative_kind == "node"
+                    )
+                    algo_name = f"{len(routes)} {'Node' if alternative_kind == 'node' else 'Edge'}-Disjoint Paths"
+                path = routes[0].path
+                path_cost = routes[0].cost
+                visited_nodes = routes[0].explored
+            elif algorithm == "Find Maximum Flow (Min Cut)":
+                # Link weights are capacities. The residual network is kept between
+                # runs, so asking again after raising a capacity only tops the flow up
+                flow_key = (
+                    st.session_state.graph_version,
+                    None if routing_graph is st.session_state.graph else (tuple(sorted(failed_edges)), tuple(sorted(failed_nodes)))
+                )
+                if st.session_state.flow_network is None or st.session_state.flow_network[0] != flow_key:
+                    st.session_state.flow_network = (flow_key, FlowNetwork(routing_graph))
+                flow_result = st.session_state.flow_network[1].max_flow(start_node, end_node)
+                if not flow_result.paths:
+                    raise NoPathError(f"No flow can be sent from {start_node!r} to {end_node!r}")
+                path = flow_result.paths[0][0]
+                path_cost = flow_result.value
+                algo_name = "Maximum Flow (Min Cut)"
                 
-                path = nx.shortest_path(G_neg, source=start_node, target=end_node, weight='weight')
-                path_cost = sum(st.session_state.graph[path[i]][path[i+1]]['weight'] for i in range(len(path)-1))
+                # The source side of the minimum cut, in the order the residual search reached it
+                visited_nodes = flow_result.source_side
+            else:
+                cpm_result = critical_path(routing_graph, source=start_node, target=end_node)
+                path = cpm_result.path
+                path_cost = cpm_result.length
                 algo_name = "Longest Path (Critical Path)"
                 
-                # For longest path, visited nodes are similar to shortest path exploration
-                visited_nodes = list(nx.single_source_shortest_path(G_neg, start_node).keys())
+                # Nodes in the order the forward pass scheduled them
+                visited_nodes = cpm_result.order
             
+            if cached_result is None:
+                if cpm_result is None and flow_result is None and routing_graph is not st.session_state.graph and intact_cost is None:
+                    distance_index = st.session_state.distance_index
+                    distance_index.sync(st.session_state.graph_version)
+                    intact_cost = distance_index.query(st.session_state.graph, start_node, end_node).cost
+                if sweep_links and cpm_result is None and flow_result is None:
+                    sweep = link_failure_sweep(routing_graph, start_node, end_node, path=path, remaining=distances_to_target(end_node))
+                if result_key:
+                    outcome = (path, path_cost, algo_name, visited_nodes, search, cpm_result, flow_result, routes, intact_cost, sweep)
+                    held = len(path) + len(visited_nodes) + sum(len(route.path) for route in routes)
+                    held += sum(len(route) for route, _ in flow_result.paths) if flow_result else 0
+                    held += sum(len(impact.result.path) for impact in sweep or () if impact.result is not None)
+                    results_cache.put(result_key, outcome, size=held)
+            
+            st.session_state.run_count += 1
             st.success(f"✅ {algo_name} found!")
+            if cached_result is not None:
+                st.caption("⚡ Answered from the shared result cache")
                 
-        except nx.NetworkXNoPath:
+        except (nx.NetworkXNoPath, NoPathError):
             st.error(f"❌ No path exists between **{start_node}** and **{end_node}**")
+        except CycleError as e:
+            st.error(f"❌ Critical path needs an acyclic graph. {e}")
         except Exception as e:
             st.error(f"❌ Error: {str(e)}")
+    timer.lap("algorithm")
     
-    # Prepare data for visualization
-    nodes_data = []
-    edges_data = []
-    
-    # Convert NetworkX graph to node/edge lists
-    for node in st.session_state.graph.nodes():
-        # Get or generate position for this node
-        if node not in st.session_state.node_positions:
-            # Generate initial random position
-            import random
-            st.session_state.node_positions[node] = {
-                'x': random.uniform(-300, 300),
-                'y': random.uniform(-200, 200)
-            }
-        
-        nodes_data.append({
-            'id': node,
-            'label': node,
-            'x': st.session_state.node_positions[node]['x'],
-            'y': st.session_state.node_positions[node]['y'],
-            'inPath': path is not None and node in path,
-            'isStart': node == start_node if path else False,
-            'isEnd': node == end_node if path else False
-        })
-    
-    for u, v, data in st.session_state.graph.edges(data=True):
-        is_in_path = False
-        if path:
-            for i in range(len(path)-1):
-                if path[i] == u and path[i+1] == v:
-                    is_in_path = True
-                    break
+    # Path highlighting is applied on top of whatever the browser shows. It stays
+    # (e.g. across reruns from dragging nodes) until the graph or the inputs change.
+    failures = {'failedEdges': sorted(failed_edges), 'failedNodes': sorted(failed_nodes)}
+    run_inputs = (st.session_state.graph_version, start_node, end_node, algorithm, alternative_options, str(failures))
+    if path:
+        if flow_result is not None:
+            # Every flow route is animated in turn, labelled with what it carries
+            alternatives = [{'path': route, 'cost': amount} for route, amount in flow_result.paths[1:]]
+        else:
+            alternatives = [{'path': route.path, 'cost': route.cost} for route in routes[1:]]
+        overlay = {
+            'runId': st.session_state.run_count,
+            'path': path,
+            'cost': path_cost,
+            # Further routes the animation cycles through after the first
+            'alternatives': alternatives,
+            'visitedNodes': visited_nodes,
+            'routeLabel': 'flow' if flow_result is not None else 'cost',
+            'cutEdges': [[u, v] for u, v, _ in flow_result.cut] if flow_result is not None else [],
+            'algoName': algo_name,
+            'startNode': start_node,
+            'endNode': end_node
+        }
+        st.session_state.view_overlay = (run_inputs, overlay)
+    elif not run_simulation and st.session_state.view_overlay and st.session_state.view_overlay[0] == run_inputs:
+        overlay = st.session_state.view_overlay[1]
+    else:
+        overlay = {'runId': None, 'path': [], 'cost': None, 'alternatives': [], 'visitedNodes': [], 'routeLabel': 'cost', 'cutEdges': [], 'algoName': "", 'startNode': "", 'endNode': ""}
+        st.session_state.view_overlay = None
+    # Failed links and nodes are marked whether or not a path is shown
+    overlay = dict(overlay, **failures)
+    
+    # Level of detail for the view
+    render_settings = st.session_state.render_settings
+    if render_override == "auto":
+        render_mode = choose_mode(st.session_state.graph, render_settings)
+    else:
+        render_mode = render_override
+    
+    if render_mode == "overview":
+        # Only the path neighbourhood in detail, everything else folded into clusters
+        focus = path_neighborhood(
+            st.session_state.graph, overlay['path'] + [node for route in overlay['alternatives'] for node in route['path']],
+            hops=render_settings.neighborhood_hops,
+            limit=render_settings.max_detail_nodes
+        )
+        overlay = dict(overlay, visitedNodes=[node for node in overlay['visitedNodes'] if node in focus])
+        # Clusters depend on the focus, so every path gets its own snapshot
+        view_base = f"overview:{st.session_state.graph_version}:{hash(frozenset(focus))}"
+    else:
+        view_base = f"{render_mode}:{st.session_state.view_log.base}"
+    
+    # Send the browser only what it doesn't have yet
+    snapshot = None
+    delta = None
+    if view_sent != (view_base, st.session_state.graph_version):
+        added = None
+        if view_sent is not None and view_sent[0] == view_base and render_mode != "overview":
+            added = st.session_state.view_log.since(view_sent[1])
         
-        edges_data.append({
-            'from': u,
-            'to': v,
-            'weight': data['weight'],
-            'inPath': is_in_path
-        })
-    
-    # Create interactive visualization using vis.js
-    graph_data = {
-        'nodes': nodes_data,
-        'edges': edges_data,
-        'path': path if path else [],
-        'visitedNodes': visited_nodes if visited_nodes else [],
-        'animationSpeed': st.session_state.animation_speed,
-        'graphName': st.session_state.graph_name,
-        'algoName': algo_name if algo_name else "",
-        'startNode': start_node if path else "",
-        'endNode': end_node if path else ""
-    }
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
-        <style>
-            body {{
-                margin: 0;
-                padding: 0;
-                background-color: #0a0a0a;
-                font-family: 'Arial', sans-serif;
-            }}
-            #mynetwork {{
-                width: 100%;
-                height: 600px;
-                background: #000000;
-                border: 3px solid #00ff88;
-                box-shadow: 0 0 30px rgba(0, 255, 136, 0.3);
-            }}
-            #graph-title {{
-                position: absolute;
-                top: 15px;
-                left: 20px;
-                color: #00ff88;
-                font-size: 26px;
-                font-weight: bold;
-                text-shadow: 0 0 10px rgba(0, 255, 136, 0.8);
-                z-index: 1000;
-                background: rgba(0, 0, 0, 0.9);
-                padding: 12px 25px;
-                border-radius: 10px;
-                border: 2px solid #00ff88;
-                box-shadow: 0 0 20px rgba(0, 255, 136, 0.4);
-            }}
-            #status-box {{
-                position: absolute;
-                bottom: 15px;
-                left: 20px;
-                color: #ffffff;
-                font-size: 14px;
-                z-index: 1000;
-                background: rgba(0, 0, 0, 0.95);
-                padding: 15px;
-                border-radius: 10px;
-                border: 2px solid #00ff88;
-                min-width: 250px;
-                box-shadow: 0 0 20px rgba(0, 255, 136, 0.4);
-            }}
-            .status-item {{
-                margin: 8px 0;
-                font-size: 13px;
-            }}
-            .status-label {{
-                color: #00ff88;
-                font-weight: bold;
-            }}
-            #path-display {{
-                position: absolute;
-                bottom: 15px;
-                right: 20px;
-                color: #ffffff;
-                font-size: 14px;
-                z-index: 1000;
-                background: rgba(0, 0, 0, 0.95);
-                padding: 15px;
-                border-radius: 10px;
-                border: 2px solid #ff00ff;
-                max-width: 400px;
-                box-shadow: 0 0 20px rgba(255, 0, 255, 0.4);
-            }}
-            .path-title {{
-                color: #ff00ff;
-                font-weight: bold;
-                font-size: 16px;
-                margin-bottom: 10px;
-                text-shadow: 0 0 10px rgba(255, 0, 255, 0.8);
-            }}
-            .path-steps {{
-                color: #00ffff;
-                font-size: 13px;
-                line-height: 1.8;
-            }}
-            .path-arrow {{
-                color: #ffff00;
-                font-weight: bold;
-            }}
-        </style>
-    </head>
-    <body>
-        <div id="graph-title"></div>
-        <div id="mynetwork"></div>
-        <div id="status-box">
-            <div class="status-item"><span class="status-label">Status:</span> <span id="status-text">Ready</span></div>
-            <div class="status-item"><span class="status-label">Current Node:</span> <span id="current-node">-</span></div>
-            <div class="status-item"><span class="status-label">Nodes Explored:</span> <span id="explored-count">0</span></div>
-            <div class="status-item"><span class="status-label">Progress:</span> <span id="progress-text">0%</span></div>
-        </div>
-        <div id="path-display" style="display: none;">
-            <div class="path-title">🎯 Path Traversed</div>
-            <div class="path-steps" id="path-steps"></div>
-        </div>
-        <script type="text/javascript">
-            var graphData = {json.dumps(graph_data)};
-            
-            // Set graph title
-            document.getElementById('graph-title').textContent = graphData.graphName + (graphData.algoName ? ' - ' + graphData.algoName : '');
-            
-            // Create nodes
-            var nodes = new vis.DataSet(
-                graphData.nodes.map(function(node) {{
-                    var nodeColor = '#1e90ff'; // Default blue
-                    var borderColor = '#0066cc';
-                    
-                    if (node.isStart) {{
-                        nodeColor = '#00ff00'; // Green for start
-                        borderColor = '#00cc00';
-                    }} else if (node.isEnd) {{
-                        nodeColor = '#ff0000'; // Red for end
-                        borderColor = '#cc0000';
-                    }}
-                    
-                    return {{
-                        id: node.id,
-                        label: node.label,
-                        x: node.x,
-                        y: node.y,
-                        color: {{
-                            background: nodeColor,
-                            border: borderColor,
-                            highlight: {{
-                                background: '#00ffff',
-                                border: '#00cccc'
-                            }},
-                            hover: {{
-                                background: '#00ffff',
-                                border: '#00cccc'
-                            }}
-                        }},
-                        font: {{
-                            color: '#ffffff',
-                            size: 18,
-                            face: 'arial',
-                            bold: true
-                        }},
-                        size: 35,
-                        shadow: {{
-                            enabled: true,
-                            size: 15,
-                            x: 3,
-                            y: 3,
-                            color: 'rgba(0, 255, 255, 0.5)'
-                        }},
-                        physics: false
-                    }};
-                }})
-            );
-            
-            // Create edges
-            var edges = new vis.DataSet(
-                graphData.edges.map(function(edge) {{
-                    return {{
-                        from: edge.from,
-                        to: edge.to,
-                        label: edge.weight.toFixed(1),
-                        arrows: 'to',
-                        color: {{
-                            color: '#666666',
-                            highlight: '#00ffff'
-                        }},
-                        width: 2,
-                        font: {{
-                            size: 14,
-                            align: 'middle',
-                            background: '#000000',
-                            color: '#ffff00',
-                            strokeWidth: 2,
-                            strokeColor: '#000000'
-                        }},
-                        smooth: {{
-                            type: 'curvedCW',
-                            roundness: 0.2
-                        }}
-                    }};
-                }})
-            );
-            
-            var container = document.getElementById('mynetwork');
-            var data = {{
-                nodes: nodes,
-                edges: edges
-            }};
-            
-            var options = {{
-                physics: {{
-                    enabled: false
-                }},
-                interaction: {{
-                    dragNodes: true,
-                    dragView: true,
-                    zoomView: true,
-                    hover: true,
-                    hoverConnectedEdges: true,
-                    selectConnectedEdges: false,
-                    navigationButtons: false,
-                    keyboard: false
-                }},
-                manipulation: {{
-                    enabled: false
-                }},
-                edges: {{
-                    arrows: {{
-                        to: {{
-                            enabled: true,
-                            scaleFactor: 1.2
-                        }}
-                    }},
-                    smooth: {{
-                        type: 'curvedCW',
-                        roundness: 0.2
-                    }}
-                }},
-                nodes: {{
-                    shape: 'dot',
-                    borderWidth: 3,
-                    borderWidthSelected: 4
-                }}
-            }};
-            
-            var network = new vis.Network(container, data, options);
-            
-            // Save positions when nodes are dragged
-            network.on('dragEnd', function(params) {{
-                if (params.nodes.length > 0) {{
-                    var nodeId = params.nodes[0];
-                    var position = network.getPositions([nodeId])[nodeId];
-                    
-                    // Send position back to Streamlit
-                    window.parent.postMessage({{
-                        type: 'streamlit:setComponentValue',
-                        nodeId: nodeId,
-                        position: position
-                    }}, '*');
-                }}
-            }});
-            
-            // Animation function
-            async function animatePathfinding() {{
-                if (graphData.path.length === 0) return;
-                
-                var animSpeed = graphData.animationSpeed;
-                var path = graphData.path;
-                var visitedNodes = graphData.visitedNodes;
-                
-                document.getElementById('status-text').textContent = 'Exploring...';
-                document.getElementById('status-text').style.color = '#ffff00';
-                
-                // First, animate exploration of visited nodes
-                for (var i = 0; i < visitedNodes.length; i++) {{
-                    var nodeId = visitedNodes[i];
-                    document.getElementById('current-node').textContent = nodeId;
-                    document.getElementById('explored-count').textContent = (i + 1);
-                    document.getElementById('progress-text').textContent = Math.round((i + 1) / visitedNodes.length * 50) + '%';
-                    
-                    // Skip start and end nodes in exploration phase
-                    if (nodeId !== graphData.startNode && nodeId !== graphData.endNode) {{
-                        nodes.update({{
-                            id: nodeId,
-                            color: {{
-                                background: '#ffaa00',
-                                border: '#ff8800'
-                            }},
-                            shadow: {{
-                                enabled: true,
-                                size: 20,
-                                color: 'rgba(255, 170, 0, 0.8)'
-                            }}
-                        }});
-                    }}
-                    
-                    await new Promise(resolve => setTimeout(resolve, animSpeed / 2));
-                }}
-                
-                document.getElementById('status-text').textContent = 'Path Found!';
-                document.getElementById('status-text').style.color = '#00ff00';
-                
-                // Reset explored nodes
-                for (var i = 0; i < visitedNodes.length; i++) {{
-                    var nodeId = visitedNodes[i];
-                    if (path.indexOf(nodeId) === -1 && nodeId !== graphData.startNode && nodeId !== graphData.endNode) {{
-                        nodes.update({{
-                            id: nodeId,
-                            color: {{
-                                background: '#1e90ff',
-                                border: '#0066cc'
-                            }},
-                            shadow: {{
-                                enabled: true,
-                                size: 15,
-                                color: 'rgba(0, 255, 255, 0.5)'
-                            }}
-                        }});
-                    }}
-                }}
-                
-                await new Promise(resolve => setTimeout(resolve, animSpeed));
-                
-                // Show path display
-                document.getElementById('path-display').style.display = 'block';
-                var pathStepsDiv = document.getElementById('path-steps');
-                pathStepsDiv.innerHTML = '';
-                
-                // Now animate the final path
-                for (var i = 0; i < path.length; i++) {{
-                    var nodeId = path[i];
-                    document.getElementById('current-node').textContent = nodeId;
-                    document.getElementById('progress-text').textContent = Math.round(50 + (i + 1) / path.length * 50) + '%';
-                    
-                    // Update path display
-                    if (i > 0) {{
-                        pathStepsDiv.innerHTML += '<span class="path-arrow"> → </span>';
-                    }}
-                    pathStepsDiv.innerHTML += '<span style="color: #00ff88; font-weight: bold;">' + nodeId + '</span>';
-                    
-                    // Don't recolor start and end nodes
-                    if (nodeId !== graphData.startNode && nodeId !== graphData.endNode) {{
-                        nodes.update({{
-                            id: nodeId,
-                            color: {{
-                                background: '#ff00ff',
-                                border: '#cc00cc'
-                            }},
-                            size: 40,
-                            shadow: {{
-                                enabled: true,
-                                size: 25,
-                                color: 'rgba(255, 0, 255, 0.9)'
-                            }}
-                        }});
-                    }}
-                    
-                    if (i > 0) {{
-                        // Highlight the edge with bright color
-                        edges.update({{
-                            from: path[i-1],
-                            to: path[i],
-                            color: {{
-                                color: '#00ffff'
-                            }},
-                            width: 5,
-                            shadow: {{
-                                enabled: true,
-                                size: 10,
-                                color: 'rgba(0, 255, 255, 0.8)'
-                            }},
-                            font: {{
-                                background: '#ffff00',
-                                color: '#000000',
-                                size: 16,
-                                strokeWidth: 0
-                            }}
-                        }});
-                    }}
-                    
-                    await new Promise(resolve => setTimeout(resolve, animSpeed));
-                }}
-                
-                document.getElementById('status-text').textContent = 'Complete!';
-                document.getElementById('status-text').style.color = '#00ff00';
-                document.getElementById('progress-text').textContent = '100%';
-            }}
-            
-            // Start animation if path exists
-            if (graphData.path.length > 0) {{
-                setTimeout(animatePathfinding, 500);
-            }}
-        </script>
-    </body>
-    </html>
-    """
+        if added is not None:
+            delta = {
+                'since': view_sent[1],
+                'nodes': [
+                    {'id': node, 'label': node, **st.session_state.node_positions[node]}
+                    for node in {node for u, v, _ in added for node in (u, v)}
+                ],
+                'edges': [{'from': u, 'to': v, 'weight': w} for u, v, w in added]
+            }
+        else:
+            # Snapshots only depend on the graph, the positions and the lineage, so a
+            # resync, or switching back to a mode shown before, reuses the last one
+            payloads = st.session_state.view_payloads
+            stamp = (st.session_state.graph_version, st.session_state.layout_version)
+            cached = payloads.pop(view_base, None)
+            if cached is not None and cached[0] == stamp:
+                snapshot = cached[1]
+            elif render_mode == "overview":
+                nodes_data, edges_data = overview_payload(
+                    st.session_state.graph, st.session_state.node_positions, focus, render_settings
+                )
+                snapshot = {'nodes': nodes_data, 'edges': edges_data}
+            else:
+                nodes_data, edges_data = detail_payload(st.session_state.graph, st.session_state.node_positions)
+                snapshot = {'nodes': nodes_data, 'edges': edges_data}
+            payloads[view_base] = (stamp, snapshot)
+            # Keep a few lineages (e.g. full and overview), dropping outdated ones first
+            for key in [key for key, (old, _) in payloads.items() if old != stamp]:
+                del payloads[key]
+            while len(payloads) > VIEW_PAYLOAD_LIMIT:
+                del payloads[next(iter(payloads))]
+    timer.lap("view_data")
+    if profiling:
+        # Roughly what goes over the websocket to the browser
+        timer.note("payload_bytes", len(json.dumps({'snapshot': snapshot, 'delta': delta, 'overlay': overlay})))
+        timer.note("nodes_sent", len(snapshot['nodes']) if snapshot else len(delta['nodes']) if delta else 0)
+        timer.lap("serialize")
     
-    components.html(html_content, height=650, scrolling=False)
+    network_view(
+        base=view_base,
+        version=st.session_state.graph_version,
+        snapshot=snapshot,
+        delta=delta,
+        overlay=overlay,
+        style=dict(STYLES[render_mode], mode=render_mode, totalNodes=st.session_state.graph.number_of_nodes()),
+        graph_name=st.session_state.graph_name,
+        animation_speed=st.session_state.animation_speed,
+        profile=profiling,
+        key="network_view"
+    )
+    st.session_state.view_sent = (view_base, st.session_state.graph_version)
+    timer.lap("component")
     
     # Display path details if path exists
     if path and path_cost is not None:
@@ -588,12 +843,26 @@ if st.session_state.graph.number_of_nodes() > 0:
         with col1:
             st.metric("Path Length (Hops)", len(path) - 1)
         with col2:
-            st.metric("Total Cost/Duration", f"{path_cost:.2f}")
+            st.metric("Maximum Flow" if flow_result is not None else "Total Cost/Duration", f"{path_cost:.2f}")
         with col3:
             st.metric("Nodes Traversed", len(path))
         with col4:
             st.metric("Nodes Explored", len(visited_nodes))
         
+        if search is not None:
+            # Work counters from the instrumented search
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Edge Relaxations", search.relaxations)
+            with col2:
+                st.metric("Peak Frontier", search.max_frontier)
+        
+        if intact_cost is not None:
+            st.metric(
+                "Cost with Failures", f"{path_cost:.2f}",
+                delta=f"{path_cost - intact_cost:+.2f} vs intact network", delta_color="inverse"
+            )
+        
         # Show detailed path with weights
         st.markdown("#### 🛤️ Detailed Path Journey")
         path_details = []
@@ -602,8 +871,279 @@ if st.session_state.graph.number_of_nodes() > 0:
             path_details.append(f"**{path[i]}** →[{edge_weight}]→ **{path[i+1]}**")
         
         st.info(" | ".join(path_details))
+        
+        if len(routes) > 1:
+            st.markdown("#### 🔀 Alternative Routes")
+            st.dataframe(
+                [
+                    {
+                        'Route': i + 1,
+                        'Cost': route.cost,
+                        'Extra Cost': route.cost - routes[0].cost,
+                        'Hops': len(route.path) - 1,
+                        'Path': " → ".join(route.path)
+                    }
+                    for i, route in enumerate(routes)
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        if sweep is not None:
+            st.markdown("#### 💥 Single-Link Failure Sweep")
+            disconnecting = sum(1 for impact in sweep if impact.result is None)
+            deltas = [impact.delta for impact in sweep if impact.result is not None]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Links Swept", len(sweep))
+            with col2:
+                st.metric("Disconnecting Links", disconnecting)
+            with col3:
+                st.metric("Worst Cost Increase", f"{max(deltas):+.2f}" if deltas else "-")
+            st.dataframe(pd.DataFrame([impact.as_row() for impact in sweep]), use_container_width=True, hide_index=True)
+        
+        if flow_result is not None:
+            st.markdown("#### 🌊 Minimum Cut")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Cut Links", len(flow_result.cut))
+            with col2:
+                st.metric("Flow Routes", len(flow_result.paths))
+            with col3:
+                st.metric("Dinic Phases", flow_result.phases)
+            st.caption("Every unit of flow crosses these links; their capacities add up to the maximum flow.")
+            st.dataframe(
+                [{'Link': f"{u} → {v}", 'Capacity': capacity} for u, v, capacity in flow_result.cut],
+                use_container_width=True,
+                hide_index=True
+            )
+            with st.expander("🛤️ Flow Routes"):
+                st.dataframe(
+                    [
+                        {'Route': i + 1, 'Flow': amount, 'Hops': len(route) - 1, 'Path': " → ".join(route)}
+                        for i, (route, amount) in enumerate(flow_result.paths)
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
+        
+        if cpm_result is not None:
+            with st.expander("⏱️ Schedule (Earliest/Latest Start & Slack)"):
+                st.dataframe(
+                    [
+                        {
+                            'Task': node,
+                            'Earliest Start': cpm_result.earliest_start[node],
+                            'Latest Start': cpm_result.latest_start[node],
+                            'Slack': cpm_result.slack[node],
+                            'Critical': cpm_result.slack[node] == 0
+                        }
+                        for node in cpm_result.order if node in cpm_result.slack
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
+    timer.lap("details")
+    
+    # The shape of the graph before querying it
+    with st.expander("🧩 Component Structure"):
+        if st.checkbox("Analyse strongly connected components", key="show_components",
+                       help="Every node of a component reaches every other; between components, paths only run one way."):
+            components = current_components()
+            summary = components.summary()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Components", f"{summary['components']:,}")
+            with col2:
+                st.metric("Largest", f"{summary['largest']:,} nodes")
+            with col3:
+                st.metric("Cyclic", f"{summary['cyclic']:,}")
+            with col4:
+                st.metric("Links Between", f"{summary['condensation_edges']:,}")
+            if summary['cyclic'] == 0:
+                st.caption("✅ The graph is acyclic, so the critical path can be found from any node.")
+            if start_node:
+                reached = sum(len(components.members[c]) for c in components.reach(start_node))
+                st.caption(f"**{start_node}** reaches {reached:,} of {summary['nodes']:,} nodes")
+            st.dataframe(pd.DataFrame(components.component_rows()), use_container_width=True, hide_index=True)
+            st.caption("Largest components, in the order paths can run between them")
+    timer.lap("components")
+    
+    # Batch mode: many source/destination pairs in one go
+    st.markdown("---")
+    with st.expander("📦 Batch Queries"):
+        pair_source = st.radio(
+            "Pairs",
+            options=["upload", "generate"],
+            format_func=lambda k: "Upload a pairs file (source, target)" if k == "upload" else "Every source to every target",
+            horizontal=True,
+            key="batch_pair_source"
+        )
+        pairs = None
+        if pair_source == "upload":
+            pairs_file = st.file_uploader("Pairs CSV or whitespace list", type=["csv", "tsv", "txt"], key="batch_pairs_file")
+            if pairs_file is not None:
+                try:
+                    pairs_file.seek(0)
+                    pairs = list(iter_pairs(pairs_file))
+                except ValueError as e:
+                    st.error(f"❌ Could not read pairs: {e}")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                batch_sources = st.text_area("Sources (one per line)", key="batch_sources")
+            with col2:
+                batch_targets = st.text_area("Targets (one per line)", key="batch_targets")
+            pairs = all_pairs(
+                [n.strip() for n in batch_sources.splitlines() if n.strip()],
+                [n.strip() for n in batch_targets.splitlines() if n.strip()]
+            )
+        
+        batch_workers = st.number_input("Worker processes", min_value=1, max_value=64, value=os.cpu_count() or 1, key="batch_workers")
+        if st.button("▶️ Run Batch", disabled=not pairs):
+            with st.spinner(f"Routing {len(pairs):,} pairs..."):
+                started = time.perf_counter()
+                results = batch_routes(st.session_state.graph, pairs, workers=batch_workers)
+                elapsed = time.perf_counter() - started
+            report = pd.DataFrame([result.as_row() for result in results])
+            report["hops"] = report["hops"].astype("Int64")
+            stats = {
+                'pairs': len(results),
+                'sources': len({source for source, _ in pairs}),
+                'reachable': int(report["cost"].notna().sum()),
+                'elapsed': elapsed
+            }
+            st.session_state.batch_report = (st.session_state.graph_version, report, stats)
+        
+        if st.session_state.batch_report is not None:
+            report_version, report, stats = st.session_state.batch_report
+            if report_version != st.session_state.graph_version:
+                st.warning("⚠️ The graph changed since this batch ran")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Pairs", f"{stats['pairs']:,}")
+            with col2:
+                st.metric("Distinct Sources", f"{stats['sources']:,}")
+            with col3:
+                st.metric("Reachable", f"{stats['reachable']:,}")
+            with col4:
+                st.metric("Pairs/second", f"{stats['pairs'] / max(stats['elapsed'], 1e-9):,.0f}")
+            st.dataframe(report.head(1000), use_container_width=True, hide_index=True)
+            if len(report) > 1000:
+                st.caption(f"Showing the first 1,000 of {len(report):,} rows; download the CSV for all of them")
+            st.download_button(
+                "⬇️ Download CSV",
+                data=report.to_csv(index=False).encode("utf-8"),
+                file_name="batch_routes.csv",
+                mime="text/csv"
+            )
+    timer.lap("batch")
+    
+    # Packet-level traffic over the current routes
+    with st.expander("🚦 Traffic Simulation"):
+        st.caption("Flows send packets along their shortest path; edge weights are link latencies, in the same time unit as the rates.")
+        flows_text = st.text_area(
+            "Flows (source, target, packets per time unit — one per line)",
+            placeholder="A, D, 50",
+            key="traffic_flows"
+        )
+        try:
+            flows = [
+                Flow(source, target, rate) for source, target, rate in iter_flows(io.BytesIO(flows_text.encode("utf-8")))
+            ] if flows_text.strip() else []
+        except ValueError as e:
+            st.error(f"❌ Could not read flows: {e}")
+            flows = []
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            traffic_duration = st.number_input("Duration", min_value=0.01, value=10.0, key="traffic_duration")
+        with col2:
+            link_capacity = st.number_input("Link capacity (packets/unit)", min_value=0.01, value=100.0, key="traffic_capacity")
+        with col3:
+            link_buffer = st.number_input("Link buffer (packets)", min_value=1, value=64, key="traffic_buffer")
+        with col4:
+            poisson = st.checkbox("Poisson arrivals", value=True, key="traffic_poisson")
+        
+        if st.button("▶️ Run Traffic", disabled=not flows):
+            try:
+                simulation = TrafficSimulation(
+                    routing_graph, [Flow(f.source, f.target, f.rate, poisson) for f in flows],
+                    capacity=link_capacity, buffer=link_buffer
+                )
+            except NoPathError as e:
+                st.error(f"❌ {e}")
+                simulation = None
+            if simulation is not None:
+                # Results stream in as the simulated clock advances
+                progress = st.progress(0.0)
+                live = st.empty()
+                reports = []
+                started = time.perf_counter()
+                for report in simulation.run(traffic_duration, interval=traffic_duration / 20):
+                    reports.append(report.as_row())
+                    progress.progress(min(1.0, report.time / traffic_duration))
+                    with live.container():
+                        col1, col2, col3, col4 = st.columns(4)
+                        with col1:
+                            st.metric("Delivered", f"{report.delivered:,}")
+                        with col2:
+                            st.metric("Dropped", f"{report.dropped:,}")
+                        with col3:
+                            st.metric("Throughput", f"{report.throughput:,.1f}/unit")
+                        with col4:
+                            st.metric("Events", f"{report.events:,}")
+                        st.line_chart(pd.DataFrame(reports).set_index("time")[["throughput"]])
+                elapsed = time.perf_counter() - started
+                live.empty()
+                progress.empty()
+                stats = {
+                    'events': simulation.events,
+                    'elapsed': elapsed,
+                    'latency': simulation.latency_percentiles(),
+                    'delivered': sum(simulation.delivered),
+                    'dropped': sum(simulation.dropped),
+                    'duration': simulation.now
+                }
+                st.session_state.traffic_report = (
+                    st.session_state.graph_version,
+                    pd.DataFrame(reports),
+                    pd.DataFrame([load.as_row() for load in simulation.link_loads()]),
+                    pd.DataFrame(simulation.flow_rows()),
+                    stats
+                )
+        
+        if st.session_state.traffic_report is not None:
+            report_version, reports, links, flow_table, stats = st.session_state.traffic_report
+            if report_version != st.session_state.graph_version:
+                st.warning("⚠️ The graph changed since this traffic run")
+            latency = stats['latency']
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                st.metric("Throughput", f"{stats['delivered'] / stats['duration']:,.1f}/unit")
+            with col2:
+                st.metric("Loss", f"{stats['dropped'] / max(stats['delivered'] + stats['dropped'], 1):.1%}")
+            with col3:
+                st.metric("p50 Latency", "–" if latency[50] is None else f"{latency[50]:.4g}")
+            with col4:
+                st.metric("p99 Latency", "–" if latency[99] is None else f"{latency[99]:.4g}")
+            with col5:
+                st.metric("Events/second", f"{stats['events'] / max(stats['elapsed'], 1e-9):,.0f}")
+            st.line_chart(reports.set_index("time")[["throughput"]])
+            st.line_chart(reports.set_index("time")[[c for c in reports.columns if c.endswith("latency")]])
+            st.markdown("**Link utilization**")
+            st.dataframe(links, use_container_width=True, hide_index=True)
+            st.markdown("**Flows**")
+            st.dataframe(flow_table, use_container_width=True, hide_index=True)
+    timer.lap("traffic")
+    
+    if profiling:
+        # Only reruns that sent the browser something get a client render time
+        sent = (view_base, st.session_state.graph_version) if snapshot or delta else None
+        st.session_state.profile_history.add(timer, tag=sent)
 
 else:
+    # No view on the page; a new one starts from a snapshot
+    st.session_state.view_sent = None
     st.info("👈 Start by adding connections in the sidebar to build your network graph")
     st.markdown("""
     ### How to use:
@@ -612,6 +1152,10 @@ else:
     3. **Select start and destination** nodes
     4. **Choose an algorithm**:
        - **Shortest Path (Dijkstra)**: Finds the path with minimum total weight
+       - **Shortest Path (A*)**: The same path, found sooner by heading towards the destination using node positions (layout or latitude/longitude)
+       - **Shortest Path (Bidirectional Dijkstra)**: The same path again, searched from both ends at once so fewer nodes are explored
+       - **Alternative Paths (Failover)**: The K cheapest loopless paths, or backup paths sharing no links (or no nodes), animated one after another
+       - **Maximum Flow (Min Cut)**: Treats weights as link capacities and finds how much can flow from start to destination, and which links limit it
        - **Longest Path (Critical Path)**: Finds the path with maximum total weight (useful for bottleneck analysis)
     5. **Adjust animation speed** to watch the pathfinding process
     6. **Run the simulation** to see the animated pathfinding
@@ -628,6 +1172,7 @@ else:
     - **Orange Glow**: Nodes being explored
     - **Purple/Magenta Glow**: Final path nodes
     - **Cyan/Bright Edges**: Path edges with glowing effect
+    - **Thick Orange Edges**: Minimum cut links (Maximum Flow)
     
     ### Example:
     Try creating a network like:
@@ -637,3 +1182,30 @@ else:
     - C → D (weight: 1)
     - Then find the path from A to D and watch the animation!
     """)
+
+if profiling:
+    with profile_panel:
+        cache_stats = shared_results().stats()
+        st.caption(
+            f"Shared result cache: {cache_stats['entries']:,} entries · {cache_stats['hits']:,} hits · "
+            f"{cache_stats['misses']:,} misses ({cache_stats['hit_rate']:.0%} hit rate) · {cache_stats['evictions']:,} evicted"
+        )
+        history = st.session_state.profile_history
+        if len(history) == 0:
+            st.caption("No profiled reruns yet")
+        else:
+            st.dataframe(
+                pd.DataFrame.from_dict(history.summary(), orient="index")
+                .drop(columns="count").mul(1000).round(1).rename_axis("stage (ms)"),
+                use_container_width=True
+            )
+            sizes = history.runs[-1]['sizes']
+            if sizes:
+                st.caption(" · ".join(f"{name}: {value:,}" for name, value in sizes.items()))
+            st.caption(f"Last {len(history)} reruns; client_render arrives one rerun later")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("JSON", data=history.to_json(), file_name="profile.json", mime="application/json")
+            with col2:
+                st.download_button("Prometheus", data=history.to_prometheus(), file_name="profile.prom", mime="text/plain")
+            st.button("Clear history", on_click=history.clear)